@@ -0,0 +1,189 @@
+import os
+import json
+import queue
+import threading
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtGui import QTextCursor
+from text_index import utf16_len
+
+
+def apply_ops(text, ops):
+    # مکان‌ها مثل contentsChange در Qt به واحد UTF-16 هستند، پس روی متن UTF-16 اعمال می‌شوند
+    data = bytearray(text.encode('utf-16-le', 'surrogatepass'))
+    for position, removed, inserted in ops:
+        data[2 * position:2 * (position + removed)] = inserted.encode('utf-16-le', 'surrogatepass')
+    return data.decode('utf-16-le', 'surrogatepass')
+
+
+def coalesce(ops):
+    # تایپ پشت سر هم (درج‌های چسبیده به هم) یک عملیات می‌شود
+    merged = []
+    for op in ops:
+        if merged:
+            position, removed, inserted = merged[-1]
+            if op[1] == 0 and op[0] == position + utf16_len(inserted):
+                merged[-1] = (position, removed, inserted + op[2])
+                continue
+        merged.append(op)
+    return merged
+
+
+class PageJournal:
+    # متن پایه در فایل .txt و تغییرات بعدی به صورت خط‌های JSON در فایل .journal
+    COMPACT_AFTER = 1000
+
+    def __init__(self, directory, page_id):
+        self.snapshot_path = os.path.join(directory, f"page_{page_id}.txt")
+        self.journal_path = os.path.join(directory, f"page_{page_id}.journal")
+        self.op_count = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding='utf-8', errors='surrogatepass') as f:
+                self.op_count = sum(1 for _ in f)
+
+    def exists(self):
+        return os.path.exists(self.snapshot_path)
+
+    def write_snapshot(self, text):
+        temp = self.snapshot_path + ".tmp"
+        with open(temp, 'w', encoding='utf-8', errors='surrogatepass', newline='') as f:
+            f.write(text)
+        os.replace(temp, self.snapshot_path)
+        open(self.journal_path, 'w').close()
+        self.op_count = 0
+
+    def append(self, ops):
+        with open(self.journal_path, 'a', encoding='utf-8', errors='surrogatepass') as f:
+            f.writelines(json.dumps(op, ensure_ascii=False) + "\n" for op in ops)
+        self.op_count += len(ops)
+        if self.op_count >= self.COMPACT_AFTER:
+            self.compact()
+
+    def read_ops(self):
+        if not os.path.exists(self.journal_path):
+            return []
+        ops = []
+        with open(self.journal_path, encoding='utf-8', errors='surrogatepass') as f:
+            for line in f:
+                try:
+                    ops.append(json.loads(line))
+                except ValueError:
+                    # خط نیمه‌کاره آخر (مثلا قطع برق وسط نوشتن)
+                    break
+        return ops
+
+    def restore(self):
+        with open(self.snapshot_path, encoding='utf-8', errors='surrogatepass', newline='') as f:
+            text = f.read()
+        return apply_ops(text, self.read_ops())
+
+    def compact(self):
+        self.write_snapshot(self.restore())
+
+
+class AutosaveManager(QObject):
+    # تغییرات در thread رابط کاربری فقط ثبت می‌شوند (بدون خواندن کل متن)؛
+    # نوشتن در فایل و فشرده‌سازی ژورنال در یک thread جدا انجام می‌شود
+    DEBOUNCE_MS = 500
+
+    def __init__(self, directory="autosave", parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.watched = {}
+        self.pending = {}
+        self.unsaved = {}
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS)
+        self._timer.timeout.connect(self.flush)
+
+        self._queue = queue.Queue()
+        self._journals = {}
+        self._worker = threading.Thread(target=self._work_loop, daemon=True)
+        self._worker.start()
+
+    def saved_page_ids(self):
+        ids = []
+        for name in os.listdir(self.directory):
+            if name.startswith("page_") and name.endswith(".txt"):
+                ids.append(int(name[5:-4]))
+        return sorted(ids)
+
+    def new_page_id(self):
+        used = set(self.saved_page_ids()) | set(self.watched)
+        return max(used, default=-1) + 1
+
+    def restore(self, page_id):
+        # نوشتن‌های در صف (مثلا از صفحه‌ای که همین الان بسته شده) اول تمام شوند
+        self._queue.join()
+        journal = PageJournal(self.directory, page_id)
+        return journal.restore() if journal.exists() else None
+
+    def watch(self, page_id, document):
+        def on_change(position, removed, added):
+            self.record(page_id, document, position, removed, added)
+
+        document.contentsChange.connect(on_change)
+        self.watched[page_id] = (document, on_change)
+        # متن پایه فقط با اولین ویرایش نوشته می‌شود تا صفحه‌های دست نخورده فایلی نسازند
+        if not PageJournal(self.directory, page_id).exists():
+            self.unsaved[page_id] = document.toPlainText()
+
+    def unwatch(self, page_id):
+        if page_id not in self.watched:
+            return
+        document, on_change = self.watched.pop(page_id)
+        self.unsaved.pop(page_id, None)
+        try:
+            document.contentsChange.disconnect(on_change)
+        except (TypeError, RuntimeError):
+            pass
+        self.flush()
+
+    def record(self, page_id, document, position, removed, added):
+        # فقط متن درج شده خوانده می‌شود، پس هزینه به اندازه سند بستگی ندارد
+        end = min(position + added, document.characterCount() - 1)
+        cursor = QTextCursor(document)
+        cursor.setPosition(position)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        inserted = cursor.selectedText().replace('\u2029', '\n')
+        if page_id in self.unsaved:
+            self._queue.put(('snapshot', page_id, self.unsaved.pop(page_id)))
+        self.pending.setdefault(page_id, []).append((position, removed, inserted))
+        self._timer.start()
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        for page_id, ops in pending.items():
+            self._queue.put(('ops', page_id, ops))
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._worker.join()
+
+    def _journal(self, page_id):
+        journal = self._journals.get(page_id)
+        if journal is None:
+            journal = self._journals[page_id] = PageJournal(self.directory, page_id)
+        return journal
+
+    def _work_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            kind, page_id, payload = item
+            journal = self._journal(page_id)
+            try:
+                if kind == 'snapshot':
+                    if not journal.exists():
+                        journal.write_snapshot(payload)
+                else:
+                    journal.append(coalesce(payload))
+            except (OSError, ValueError) as e:
+                print(f"ذخیره خودکار صفحه {page_id} ناموفق بود: {e}")
+            finally:
+                self._queue.task_done()
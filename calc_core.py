@@ -0,0 +1,233 @@
+import ast
+import sys
+import math
+import time
+import itertools
+import numpy as np
+
+# توابعی که در عبارت‌های ماشین حساب مجاز هستند
+ALLOWED_NAMES = {
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+    'sqrt': np.sqrt, 'exp': np.exp, 'log': np.log, 'log10': np.log10,
+    'abs': np.abs, 'pi': math.pi, 'e': math.e,
+}
+
+
+# گره‌های مجاز درخت عبارت؛ Attribute و Lambda و بقیه رد می‌شوند
+ALLOWED_NODES = (
+    ast.Expression, ast.Name, ast.Load, ast.Constant, ast.BinOp, ast.UnaryOp, ast.Call,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub,
+)
+
+
+def check_tree(tree, variables):
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"عبارت مجاز نیست: {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id not in ALLOWED_NAMES and node.id not in variables:
+            raise ValueError(f"نام ناشناخته: {node.id}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, complex)):
+            raise ValueError(f"مقدار مجاز نیست: {node.value!r}")
+        if isinstance(node, ast.Call) and (
+            not isinstance(node.func, ast.Name) or not callable(ALLOWED_NAMES.get(node.func.id))
+            or node.keywords
+        ):
+            raise ValueError("فقط توابع مجاز قابل فراخوانی هستند")
+
+
+def compile_expression(expr, variables=('x',)):
+    try:
+        tree = ast.parse(expr, '<calculator>', 'eval')
+    except SyntaxError as e:
+        raise ValueError(f"عبارت نامعتبر: {e.msg}") from None
+    check_tree(tree, variables)
+    return compile(tree, '<calculator>', 'eval')
+
+
+def evaluate(code, **values):
+    namespace = dict(ALLOWED_NAMES)
+    namespace.update(values)
+    return eval(code, {'__builtins__': {}}, namespace)
+
+
+def parse_range(text):
+    # قالب: "x = 0..1e6 step 1" یا "0..10" (گام پیش‌فرض 1)
+    text = text.strip()
+    if '=' in text:
+        text = text.split('=', 1)[1]
+    if 'step' in text:
+        bounds, step = text.split('step', 1)
+        step = float(step)
+    else:
+        bounds, step = text, 1.0
+    if '..' not in bounds:
+        raise ValueError("بازه باید به شکل a..b باشد")
+    start, stop = (float(part) for part in bounds.split('..', 1))
+
+    if step == 0 or (stop - start) * step < 0:
+        raise ValueError("گام با بازه سازگار نیست")
+
+    # تعداد نقاط را یک‌بار حساب می‌کنیم تا خطای جمع شدن گام‌ها پیش نیاید
+    count = int(math.floor((stop - start) / step + 1e-9)) + 1
+    return start + step * np.arange(count, dtype=np.float64)
+
+
+def tabulate(expr, range_text):
+    xs = parse_range(range_text)
+    code = compile_expression(expr)
+    with np.errstate(all='ignore'):
+        ys = np.asarray(evaluate(code, x=xs), dtype=np.float64)
+    # عبارت ثابت (بدون x) را به طول بازه می‌رسانیم
+    ys = np.broadcast_to(ys, xs.shape)
+    return xs, ys
+
+
+def export_csv(filename, xs, ys, header='x,y', chunk_rows=16384):
+    # تکه به تکه قالب‌بندی و نوشته می‌شود؛ هر تکه با یک عمل % رشته (سریع‌تر از savetxt)
+    with open(filename, 'w') as f:
+        f.write(header + '\n')
+        for start in range(0, len(xs), chunk_rows):
+            block = np.column_stack((xs[start:start + chunk_rows], ys[start:start + chunk_rows]))
+            f.write(('%.10g,%.10g\n' * len(block)) % tuple(block.ravel().tolist()))
+
+
+# عملگرهای homework5: هم شماره منو و هم علامت قابل قبول است
+OPERATION_CODES = {
+    '1': 0, '+': 0,
+    '2': 1, '-': 1,
+    '3': 2, '/': 2, '//': 2,
+    '4': 3, '*': 3,
+    '5': 4, '**': 4,
+}
+
+
+# نتیجه‌هایی که ممکن است از int64 بیرون بزنند با int پایتون دوباره و دقیق حساب می‌شوند
+SAFE_BITS = 62
+# عددی با بیش از این تعداد بیت در خروجی (حدود 4000 رقم) خطا حساب می‌شود
+MAX_EXACT_BITS = 13000
+
+
+def apply_operations(codes, a, b):
+    # همه عملیات یک دسته با هم و بدون حلقه پایتون حساب می‌شوند؛
+    # unsafe سطرهایی است که با بررسی اندازه عملوندها ممکن است سرریز کرده باشند
+    bad = (codes < 0) | ((codes == 2) & (b == 0)) | ((codes == 4) & (b < 0))
+    divisor = np.where(codes == 2, np.where(bad, 1, b), 1)
+    exponent = np.where((codes == 4) & ~bad, b, 0)
+    with np.errstate(all='ignore'):
+        results = np.select(
+            [codes == 0, codes == 1, codes == 2, codes == 3],
+            [a + b, a - b, a // divisor, a * b],
+            default=a ** exponent,
+        )
+        size_a = np.abs(a.astype(np.float64))
+        size_b = np.abs(b.astype(np.float64))
+        limit = 2.0 ** SAFE_BITS
+        unsafe = np.select(
+            [codes <= 2, codes == 3],
+            [(size_a >= limit) | (size_b >= limit), size_a * size_b >= limit],
+            default=(size_a > 1) & (exponent * np.log2(np.maximum(size_a, 1)) >= SAFE_BITS),
+        )
+    return results, bad, unsafe & ~bad
+
+
+def exact_operation(code, a, b):
+    # همان عملیات با int پایتون؛ None یعنی خطا
+    if code == 0:
+        return a + b
+    if code == 1:
+        return a - b
+    if code == 2:
+        return a // b if b else None
+    if code == 3:
+        return a * b
+    if code == 4 and b >= 0:
+        if abs(a) > 1 and a.bit_length() * b > MAX_EXACT_BITS:
+            return None
+        return a ** b
+    return None
+
+
+def _fix_row(parts):
+    if len(parts) == 2:
+        # "5 a" یعنی توان دو، مثل منوی homework5
+        return [parts[0], parts[1], '2']
+    if len(parts) != 3:
+        return ['?', '0', '0']
+    return parts
+
+
+def parse_operations(lines):
+    # big: سطرهایی که عملوندشان در int64 جا نمی‌شود {شماره سطر: (a, b)}
+    rows = list(map(str.split, lines))
+    if rows and set(map(len, rows)) != {3}:
+        rows = [_fix_row(parts) for parts in rows]
+    count = len(rows)
+    ops, first, second = zip(*rows) if rows else ((), (), ())
+
+    codes = np.fromiter(map(OPERATION_CODES.get, ops, itertools.repeat(-1)), np.int64, count)
+    big = {}
+    try:
+        a = np.fromiter(map(int, first), np.int64, count)
+        b = np.fromiter(map(int, second), np.int64, count)
+    except (ValueError, OverflowError):
+        # خط خراب یا عدد خیلی بزرگ در دسته: فقط همان خط‌ها جدا بررسی می‌شوند
+        a = np.zeros(count, dtype=np.int64)
+        b = np.zeros(count, dtype=np.int64)
+        for i, parts in enumerate(rows):
+            try:
+                first_value, second_value = int(parts[1]), int(parts[2])
+            except ValueError:
+                codes[i] = -1
+                continue
+            try:
+                a[i], b[i] = first_value, second_value
+            except OverflowError:
+                a[i] = b[i] = 0
+                big[i] = (first_value, second_value)
+    return codes, a, b, big
+
+
+def _format_exact(value):
+    try:
+        return 'error' if value is None else str(value)
+    except ValueError:
+        # بیش از حد ارقام قابل تبدیل به رشته
+        return 'error'
+
+
+def stream_operations(lines, chunk_size=65536):
+    lines = iter(lines)
+    while True:
+        chunk = list(itertools.islice(lines, chunk_size))
+        if not chunk:
+            return
+        codes, a, b, big = parse_operations(chunk)
+        results, bad, unsafe = apply_operations(codes, a, b)
+        output = list(map(str, results.tolist()))
+        for i in np.flatnonzero(bad).tolist():
+            output[i] = 'error'
+        for i in np.flatnonzero(unsafe).tolist():
+            if i not in big:
+                output[i] = _format_exact(exact_operation(int(codes[i]), int(a[i]), int(b[i])))
+        for i, (first_value, second_value) in big.items():
+            output[i] = _format_exact(exact_operation(int(codes[i]), first_value, second_value))
+        yield output
+
+
+def run_batch(source='-', out=sys.stdout, chunk_size=65536):
+    stream = sys.stdin if source == '-' else open(source)
+    count = 0
+    start = time.perf_counter()
+    try:
+        for results in stream_operations(stream, chunk_size):
+            out.write('\n'.join(results))
+            out.write('\n')
+            count += len(results)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0
+    print(f"{count} operations in {elapsed:.2f}s ({rate:,.0f} ops/s)", file=sys.stderr)
+    return count
@@ -0,0 +1,168 @@
+import sys
+import math
+import time
+import argparse
+import itertools
+import multiprocessing
+import numpy as np
+
+# اندازه هر بلوک ماسک (بایت = عدد) تا در cache جا شود
+BLOCK = 1 << 18
+# اعداد هر کار برای هر worker
+TASK = 1 << 24
+
+
+def check_divisors(divisors):
+    divisors = sorted({abs(int(d)) for d in divisors})
+    if not divisors or divisors[0] == 0:
+        raise ValueError("مقسوم‌علیه باید عدد غیر صفر باشد")
+    return tuple(divisors)
+
+
+def block_mask(start, stop, divisors, mask=None):
+    # خانه i ماسک یعنی عدد start + i دست کم بر یکی از مقسوم‌علیه‌ها بخش‌پذیر است؛
+    # برای هر مقسوم‌علیه فقط مضرب‌هایش با یک برش گام‌دار علامت می‌خورند
+    n = stop - start
+    if mask is None:
+        mask = np.zeros(n, dtype=bool)
+    else:
+        mask = mask[:n]
+        mask[:] = False
+    for d in divisors:
+        mask[(-start) % d::d] = True
+    return mask
+
+
+def scan_count(start, stop, divisors):
+    mask = np.empty(BLOCK, dtype=bool)
+    count = 0
+    for begin in range(start, stop, BLOCK):
+        count += int(np.count_nonzero(block_mask(begin, min(begin + BLOCK, stop), divisors, mask)))
+    return count
+
+
+def scan_values(start, stop, divisors):
+    mask = np.empty(BLOCK, dtype=bool)
+    parts = []
+    for begin in range(start, stop, BLOCK):
+        parts.append(begin + np.flatnonzero(block_mask(begin, min(begin + BLOCK, stop), divisors, mask)))
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+
+def _count_task(task):
+    return scan_count(*task)
+
+
+def _values_task(task):
+    return scan_values(*task)
+
+
+def split_tasks(start, stop, divisors, size=TASK):
+    return [(begin, min(begin + size, stop), divisors) for begin in range(start, stop, size)]
+
+
+def count(start, stop, divisors=(3, 5), workers=1):
+    # تعداد اعداد بخش‌پذیر در [start, stop) مثل range
+    divisors = check_divisors(divisors)
+    tasks = split_tasks(start, stop, divisors)
+    if workers > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(workers) as pool:
+            return sum(pool.imap_unordered(_count_task, tasks))
+    return sum(map(_count_task, tasks))
+
+
+def values(start, stop, divisors=(3, 5), workers=1):
+    # آرایه‌های پشت سر هم (به ترتیب) از اعداد بخش‌پذیر؛ کل نتیجه هیچ وقت در حافظه نیست
+    divisors = check_divisors(divisors)
+    tasks = split_tasks(start, stop, divisors, TASK // 4)
+    if workers > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(workers) as pool:
+            yield from pool.imap(_values_task, tasks)
+    else:
+        yield from map(_values_task, tasks)
+
+
+def count_formula(start, stop, divisors=(3, 5)):
+    # شمارش دقیق با اصل شمول و عدم شمول؛ برای بررسی درستی اسکن
+    divisors = check_divisors(divisors)
+    total = 0
+    for size in range(1, len(divisors) + 1):
+        for group in itertools.combinations(divisors, size):
+            step = math.lcm(*group)
+            multiples = (stop - 1) // step - (start - 1) // step
+            total += multiples if size % 2 else -multiples
+    return total
+
+
+def count_modulo(start, stop, divisors=(3, 5)):
+    # همان شرط homework4 برای هر عدد جدا
+    return sum(1 for num in range(start, stop) if any(num % d == 0 for d in divisors))
+
+
+def benchmark(n=10_000_000, divisors=(3, 5)):
+    started = time.perf_counter()
+    expected = count_modulo(0, n // 10, divisors)
+    modulo = (time.perf_counter() - started) * 10
+    started = time.perf_counter()
+    found = count(0, n, divisors)
+    scan = time.perf_counter() - started
+    assert found == count_formula(0, n, divisors) and expected == count_formula(0, n // 10, divisors)
+    print(f"per-number modulo {n / modulo:14,.0f} numbers/s (estimated from {n // 10})")
+    print(f"strided bitmask   {n / scan:14,.0f} numbers/s ({modulo / scan:.0f}x)")
+
+
+def bound(text):
+    # 1e9 هم پذیرفته می‌شود، ولی عدد صحیح بزرگ بدون گرد شدن خوانده می‌شود
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return int(float(text))
+    except OverflowError:
+        raise ValueError(text)
+
+
+def main(argv):
+    # python divisibility.py START STOP [--divisors 3 5 ...] [--values] [--workers n]
+    # python divisibility.py --benchmark
+    parser = argparse.ArgumentParser(description="شمردن عددهای بخش‌پذیر در بازه [START, STOP)")
+    parser.add_argument('start', type=bound, nargs='?')
+    parser.add_argument('stop', type=bound, nargs='?')
+    parser.add_argument('--divisors', type=int, nargs='+', default=[3, 5])
+    parser.add_argument('--values', action='store_true', help="خود عددها را چاپ کن")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--benchmark', action='store_true')
+    args = parser.parse_args(argv)
+    if args.benchmark:
+        benchmark()
+        return
+    if args.stop is None or args.stop < args.start:
+        parser.error("START و STOP لازم است و STOP نباید از START کمتر باشد")
+    try:
+        check_divisors(args.divisors)
+    except ValueError as e:
+        parser.error(str(e))
+    bounds = [args.start, args.stop]
+    divisors = args.divisors
+    workers = args.workers
+    show_values = args.values
+
+    start = time.perf_counter()
+    if show_values:
+        total = 0
+        for chunk in values(*bounds, divisors, workers):
+            if len(chunk):
+                sys.stdout.write('\n'.join(map(str, chunk.tolist())) + '\n')
+            total += len(chunk)
+    else:
+        total = count(*bounds, divisors, workers)
+        print(total)
+    elapsed = time.perf_counter() - start
+    rate = (bounds[1] - bounds[0]) / elapsed if elapsed > 0 else 0
+    print(f"{total} of {bounds[1] - bounds[0]} numbers divisible by {divisors} "
+          f"in {elapsed:.2f}s ({rate:,.0f} numbers/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
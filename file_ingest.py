@@ -0,0 +1,162 @@
+import os
+import sys
+import mmap
+import time
+import argparse
+import hashlib
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# فایل‌های بزرگ‌تر از این با mmap خوانده می‌شوند و بقیه با یک read بزرگ
+MMAP_MIN = 1024 * 1024
+CHUNK_SIZE = 8 * 1024 * 1024
+
+FileInfo = namedtuple('FileInfo', 'path size lines sha256')
+
+
+def iter_files(root):
+    # پیمایش بدون بازگشت (برای پوشه‌های خیلی عمیق)؛ فایل تکی هم قبول است
+    if not os.path.isdir(root):
+        yield root
+        return
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"skip {directory}: {e}", file=sys.stderr)
+            continue
+        subdirectories = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.path)
+            elif entry.is_file():
+                yield entry.path
+        stack.extend(reversed(subdirectories))
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_MIN:
+            data = f.read()
+            if data:
+                yield data
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # madvise در ویندوز وجود ندارد
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            for start in range(0, size, chunk_size):
+                yield mapped[start:start + chunk_size]
+
+
+def file_info(path):
+    digest = hashlib.sha256()
+    size = lines = 0
+    for chunk in read_chunks(path):
+        digest.update(chunk)
+        lines += chunk.count(b'\n')
+        size += len(chunk)
+    return FileInfo(path, size, lines, digest.hexdigest())
+
+
+def file_pieces(paths, chunk_size=CHUNK_SIZE):
+    # (مسیر، شروع) هر تکه از هر فایل؛ هر تکه جدا خوانده می‌شود تا فایل بزرگ یکجا در حافظه نیاید
+    for path in paths:
+        try:
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"skip {path}: {e}", file=sys.stderr)
+            continue
+        # فایل خالی هم یک تکه (خالی) دارد تا در خروجی دیده شود
+        for start in range(0, max(size, 1), chunk_size):
+            yield path, start
+
+
+def read_piece(piece, chunk_size=CHUNK_SIZE):
+    path, start = piece
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return path, f.read(chunk_size)
+
+
+def parallel(func, items, workers):
+    # به ترتیب پیمایش برمی‌گرداند و فقط چند فایل (یا تکه) جلوتر را همزمان می‌خواند تا حافظه محدود بماند
+    with ThreadPoolExecutor(workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append((item, pool.submit(func, item)))
+            if len(pending) >= 2 * workers:
+                yield from _result(*pending.popleft())
+        while pending:
+            yield from _result(*pending.popleft())
+
+
+def _result(item, future):
+    # فایلی که خوانده نشد (مثلا بدون دسترسی) کنار گذاشته می‌شود
+    try:
+        yield future.result()
+    except OSError as e:
+        path = item[0] if isinstance(item, tuple) else item
+        print(f"skip {path}: {e}", file=sys.stderr)
+
+
+def scan(root, workers=None):
+    # FileInfo برای هر فایل؛ hashlib و خواندن فایل GIL را آزاد می‌کنند پس thread کافی است
+    return parallel(file_info, iter_files(root), workers or min(8, os.cpu_count() or 1))
+
+
+def contents(root, workers=None):
+    # (مسیر، تکه) پشت سر هم و به ترتیب؛ حداکثر 2 * workers تکه CHUNK_SIZE همزمان در حافظه است
+    return parallel(read_piece, file_pieces(iter_files(root)), workers or min(8, os.cpu_count() or 1))
+
+
+def main(argv):
+    # python file_ingest.py [فایل یا پوشه ...] [--contents | --details] [--workers n]
+    # خروجی پیش‌فرض همان قالب sha256sum است و با sha256sum -c بررسی می‌شود
+    parser = argparse.ArgumentParser(description="خواندن و هش کردن همه فایل‌های یک پوشه")
+    parser.add_argument('roots', nargs='*', default=['.'], help="فایل‌ها یا پوشه‌ها (پیش‌فرض پوشه جاری)")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--contents', action='store_true', help="خود محتوای فایل‌ها را به stdout بفرست")
+    output.add_argument('--details', action='store_true', help="تعداد خط و اندازه هر فایل را هم چاپ کن")
+    parser.add_argument('--workers', type=int, help="تعداد threadها")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers باید مثبت باشد")
+    roots = args.roots
+    show_contents = args.contents
+    workers = args.workers
+
+    files = total = 0
+    start = time.perf_counter()
+    for root in roots:
+        if not os.path.exists(root):
+            print(f"not found: {root}", file=sys.stderr)
+            continue
+        if show_contents:
+            out = sys.stdout.buffer
+            last = None
+            for path, data in contents(root, workers):
+                out.write(data)
+                if path != last:
+                    files += 1
+                    last = path
+                total += len(data)
+            out.flush()
+        else:
+            for info in scan(root, workers):
+                if args.details:
+                    print(f"{info.sha256}  {info.lines:>10}  {info.size:>12}  {info.path}")
+                else:
+                    print(f"{info.sha256}  {info.path}")
+                files += 1
+                total += info.size
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed / 1e6 if elapsed > 0 else 0
+    print(f"{files} files, {total / 1e6:.1f} MB in {elapsed:.2f}s ({rate:,.1f} MB/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,75 @@
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import Qt, QPropertyAnimation, QPoint, QTimer
+
+
+class FloatingMessage(QLabel):
+    SHOW_DURATION = 700
+    HIDE_DURATION = 500
+    VISIBLE_MS = 2000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet(
+            "background-color: rgba(255, 255, 0, 220);"
+            "color: black; font-size: 16pt; border: 2px solid black; border-radius: 10px;"
+            "padding: 10px;"
+        )
+        self.setAlignment(Qt.AlignCenter)
+        self.setFixedSize(300, 50)
+        self.hide()
+
+        # یک انیمیشن و یک تایمر برای همه پیام‌ها؛ پیام‌های پشت سر هم فقط متن را عوض می‌کنند
+        self.anim = QPropertyAnimation(self, b"pos", self)
+        self.anim.finished.connect(self._on_animation_finished)
+
+        self.hide_timer = QTimer(self)
+        self.hide_timer.setSingleShot(True)
+        self.hide_timer.setInterval(self.VISIBLE_MS)
+        self.hide_timer.timeout.connect(self.hide_message)
+
+        self.hiding = False
+        self.group = None
+        self.count = 0
+
+    def show_message(self, text, group=None, summary=None):
+        # پیام‌های یک گروه تا وقتی پیام روی صفحه است با هم جمع می‌شوند، مثلا "5 دکمه فشار داده شد"
+        showing = self.isVisible() and not self.hiding
+        if showing and group is not None and group == self.group:
+            self.count += 1
+            if summary is not None:
+                text = summary.format(count=self.count)
+        else:
+            self.group = group
+            self.count = 1
+        self.setText(text)
+        self.hide_timer.start()
+
+        if showing:
+            return
+
+        start_x = (self.parent().width() - self.width()) // 2
+        end_y = (self.parent().height() - self.height()) // 2
+        # اگر در حال پنهان شدن بود، از همان‌جا برمی‌گردد
+        start_pos = self.pos() if self.isVisible() else QPoint(start_x, 0)
+
+        self.hiding = False
+        self.move(start_pos)
+        self.show()
+        self._animate(start_pos, QPoint(start_x, end_y), self.SHOW_DURATION)
+
+    def hide_message(self):
+        start_pos = self.pos()
+        self.hiding = True
+        self._animate(start_pos, QPoint(start_pos.x(), 0), self.HIDE_DURATION)
+
+    def _animate(self, start_pos, end_pos, duration):
+        self.anim.stop()
+        self.anim.setDuration(duration)
+        self.anim.setStartValue(start_pos)
+        self.anim.setEndValue(end_pos)
+        self.anim.start()
+
+    def _on_animation_finished(self):
+        if self.hiding:
+            self.hiding = False
+            self.hide()
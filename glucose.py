@@ -0,0 +1,386 @@
+import os
+import sys
+import argparse
+import json
+import math
+import time
+import bisect
+import timeit
+import itertools
+import numpy as np
+
+# نوع اندازه‌گیری مثل منوی homework1 و homework2
+FASTING = 1
+POST_MEAL = 2
+TYPE_CODES = {
+    '1': FASTING, 'hasht saat nashta': FASTING,
+    '2': POST_MEAL, 'pass az taqzie': POST_MEAL,
+}
+TYPE_NAMES = {FASTING: 'hasht saat nashta', POST_MEAL: 'pass az taqzie'}
+
+NORMAL, PRE_DIABETES, DIABETES, UNKNOWN, ERROR = range(5)
+LABELS = ('normal', 'pish dyabet', 'dyabet', 'namoshakhas', 'error')
+
+# هر بازه با from (>=) یا above (>) و to (<=) یا below (<) مثل شرط‌های homework؛
+# نبودن حد پایین یا بالا یعنی بی‌انتها. حدها عدد حقیقی هستند و خوانش اعشاری هم درست دسته‌بندی می‌شود.
+# حدهای پیش‌فرض از glucose_thresholds.json کنار همین فایل خوانده می‌شوند
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'glucose_thresholds.json')
+
+BLOCK_BYTES = 1024 * 1024
+
+
+def _bound(item, closed_key, open_key, default):
+    # (مقدار، بسته بودن)
+    if closed_key in item and open_key in item:
+        raise ValueError(f"{closed_key} و {open_key} با هم آمده‌اند")
+    if closed_key in item:
+        return float(item[closed_key]), True
+    if open_key in item:
+        return float(item[open_key]), False
+    return default, True
+
+
+def lower_edge(value, closed):
+    # حد پایین باز (x > a) همان حد پایین بسته روی عدد float بعد از a است
+    return value if closed else float(np.nextafter(value, math.inf))
+
+
+def ranges_to_bins(ranges):
+    # (حد پایین، بسته بودن، برچسب) پشت سر هم از منفی بی‌نهایت؛ فاصله بین بازه‌ها namoshakhas می‌شود
+    spans = []
+    for item in ranges:
+        if item.get('label') not in LABELS:
+            raise ValueError(f"برچسب ناشناخته: {item.get('label')}")
+        low, low_closed = _bound(item, 'from', 'above', -math.inf)
+        high, high_closed = _bound(item, 'to', 'below', math.inf)
+        # start اولین و stop اولین عدد بعد از بازه (هر دو به شکل حد پایین بسته)
+        start = lower_edge(low, low_closed)
+        stop = lower_edge(high, not high_closed) if math.isfinite(high) else math.inf
+        if start >= stop:
+            raise ValueError(f"بازه نامعتبر: {low} تا {high}")
+        spans.append((start, stop, low, low_closed, high, high_closed, LABELS.index(item['label'])))
+    spans.sort()
+
+    bins = []
+    end, end_value, end_closed = -math.inf, -math.inf, True
+    for start, stop, low, low_closed, high, high_closed, label in spans:
+        if start < end:
+            raise ValueError(f"بازه‌ها روی هم افتاده‌اند: {low}")
+        if start > end:
+            bins.append((end_value, end_closed, UNKNOWN))
+        bins.append((low, low_closed, label))
+        # بازه خالی بعد از "تا h" از h باز و بعد از "کمتر از h" از h بسته شروع می‌شود
+        end, end_value, end_closed = stop, high, not high_closed
+    if end < math.inf:
+        bins.append((end_value, end_closed, UNKNOWN))
+    return tuple(bins)
+
+
+def load_ranges(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+DEFAULT_RANGES = load_ranges(DEFAULT_THRESHOLDS)
+
+
+def classify_if_chain(value, kind):
+    # همان شرط‌های homework1 (برای هر نوع جدا)؛ فقط برای مقایسه در benchmark
+    if kind == FASTING:
+        if 70 <= value <= 90:
+            return NORMAL
+        elif 100 <= value <= 125:
+            return PRE_DIABETES
+        elif value >= 126:
+            return DIABETES
+    elif kind == POST_MEAL:
+        if value < 140:
+            return NORMAL
+        elif 140 <= value < 180:
+            return PRE_DIABETES
+        elif value > 200:
+            return DIABETES
+    else:
+        return ERROR
+    return UNKNOWN
+
+
+class ThresholdTable:
+    # یک مجموعه حد، هم به شکل حدهای مرتب (O(log k)) و هم جدول مستقیم روی اعداد صحیح (O(1))
+    def __init__(self, ranges=DEFAULT_RANGES):
+        self.bins = {}
+        for name, kind_ranges in ranges.items():
+            if name not in TYPE_CODES:
+                raise ValueError(f"نوع اندازه‌گیری ناشناخته: {name}")
+            self.bins[TYPE_CODES[name]] = ranges_to_bins(kind_ranges)
+
+        self.edges = {}
+        self.labels = {}
+        for kind, bins in self.bins.items():
+            self.edges[kind] = [lower_edge(lower, closed) for lower, closed, _ in bins[1:]]
+            self.labels[kind] = [label for _, _, label in bins]
+
+        # جدول مستقیم فقط برای خوانش‌های صحیح است؛ خوانش اعشاری با searchsorted دسته‌بندی می‌شود.
+        # هر خوانش بیرون از [low, high] همان برچسب low یا high را دارد
+        all_edges = sorted({edge for edges in self.edges.values() for edge in edges})
+        self.low = math.floor(all_edges[0]) - 1 if all_edges else 0
+        high = math.ceil(all_edges[-1]) if all_edges else 0
+        readings = np.arange(self.low, high + 1, dtype=np.float64)
+        self.table = np.full((max(self.bins, default=0) + 1, len(readings)), ERROR, dtype=np.int8)
+        for kind in self.bins:
+            labels = np.array(self.labels[kind], dtype=np.int8)
+            self.table[kind] = labels[np.searchsorted(self.edges[kind], readings, side='right')]
+        self.rows = {kind: self.table[kind].tolist() for kind in self.bins}
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(load_ranges(path))
+
+    def classify_one(self, value, kind):
+        # O(log k) با bisect روی حدها
+        if kind not in self.edges or value != value:
+            return ERROR
+        return self.labels[kind][bisect.bisect_right(self.edges[kind], value)]
+
+    def lookup(self, value, kind):
+        # O(1) از جدول مستقیم
+        row = self.rows.get(kind)
+        if row is None or value != value:
+            return ERROR
+        if not math.isfinite(value) or value != math.floor(value):
+            return self.classify_one(value, kind)
+        index = int(value) - self.low
+        if index < 0:
+            return row[0]
+        return row[index] if index < len(row) else row[-1]
+
+    def classify_sorted(self, values, kinds):
+        conditions = []
+        choices = []
+        for kind, edges in self.edges.items():
+            conditions.append(kinds == kind)
+            labels = np.array(self.labels[kind], dtype=np.int8)
+            choices.append(labels[np.searchsorted(edges, values, side='right')])
+        codes = np.select(conditions, choices, default=ERROR).astype(np.int8)
+        codes[np.isnan(values)] = ERROR
+        return codes
+
+    def classify(self, values, kinds):
+        # همه خوانش‌ها با یک بار خواندن از جدول، بدون حلقه پایتون
+        bad = np.isnan(values) | (kinds <= 0) | (kinds >= len(self.table))
+        whole = np.floor(np.nan_to_num(values))
+        fractional = (whole != values) & ~bad
+        index = whole - self.low
+        np.clip(index, 0, self.table.shape[1] - 1, out=index)
+        codes = self.table[np.where(bad, 0, kinds), index.astype(np.intp)]
+        codes[bad] = ERROR
+        if fractional.any():
+            codes[fractional] = self.classify_sorted(values[fractional], kinds[fractional])
+        return codes
+
+    def uncovered(self):
+        # [(نوع، از، بسته، تا، بسته)] بازه‌هایی که هیچ دسته‌ای ندارند
+        gaps = []
+        for kind, bins in self.bins.items():
+            for i, (lower, lower_closed, label) in enumerate(bins):
+                if label == UNKNOWN:
+                    if i + 1 < len(bins):
+                        upper, next_closed, _ = bins[i + 1]
+                        upper_closed = not next_closed
+                    else:
+                        upper, upper_closed = math.inf, False
+                    gaps.append((kind, lower, lower_closed, upper, upper_closed))
+        return gaps
+
+
+DEFAULT_TABLE = ThresholdTable()
+
+
+def parse_rows(block, rows):
+    # هر سطر: "خوانش,نوع"
+    count = len(rows)
+    fields = block.replace('\n', ',').split(',')
+    # تعداد کل فیلدها کافی نیست (سطر سه‌ستونی و سطر تک‌ستونی همدیگر را جبران می‌کنند)
+    if len(fields) == 2 * count and all(map((1).__eq__, map(str.count, rows, itertools.repeat(',')))):
+        try:
+            values = np.array(fields[0::2], dtype=np.float64)
+            kinds = np.fromiter(map(TYPE_CODES.get, fields[1::2], itertools.repeat(0)), np.int8, count)
+            if kinds.all():
+                return values, kinds
+        except ValueError:
+            pass
+
+    # سطر خراب در دسته: فقط همان سطرها error می‌شوند
+    values = np.full(count, np.nan)
+    kinds = np.zeros(count, dtype=np.int8)
+    for i, row in enumerate(rows):
+        parts = row.split(',')
+        if len(parts) != 2:
+            continue
+        try:
+            values[i] = float(parts[0])
+        except ValueError:
+            continue
+        kinds[i] = TYPE_CODES.get(parts[1].strip(), 0)
+    return values, kinds
+
+
+def read_blocks(stream, block_bytes=BLOCK_BYTES):
+    # فقط خط‌های کامل (بدون \n آخر)، حدود block_bytes در هر بار؛
+    # حافظه به اندازه فایل بستگی ندارد
+    carry = ''
+    while True:
+        data = stream.read(block_bytes)
+        if not data:
+            if carry.strip():
+                yield carry
+            return
+        data = carry + data
+        cut = data.rfind('\n')
+        if cut == -1:
+            carry = data
+            continue
+        carry = data[cut + 1:]
+        if cut:
+            yield data[:cut]
+
+
+def is_header(row):
+    try:
+        float(row.split(',')[0])
+        return False
+    except ValueError:
+        return True
+
+
+def split_header(blocks, is_header=is_header):
+    # (سطر عنوان CSV یا None، بقیه دسته‌ها بدون آن)
+    blocks = iter(blocks)
+    for block in blocks:
+        header, _, rest = block.partition('\n')
+        if not is_header(header):
+            return None, itertools.chain([block], blocks)
+        return header, itertools.chain([rest] if rest else [], blocks)
+    return None, blocks
+
+
+def stream_classified(stream, block_bytes=BLOCK_BYTES, table=DEFAULT_TABLE):
+    # (سطرها، برچسب‌ها) برای هر دسته؛ سطر عنوان CSV جدا برمی‌گردد
+    header, blocks = split_header(read_blocks(stream, block_bytes))
+    if header is not None:
+        yield [header], None
+    for block in blocks:
+        rows = block.split('\n')
+        values, kinds = parse_rows(block, rows)
+        yield rows, table.classify(values, kinds)
+
+
+def run_batch(source='-', target='-', block_bytes=BLOCK_BYTES, table=DEFAULT_TABLE):
+    stream = sys.stdin if source == '-' else open(source, newline=None)
+    out = sys.stdout if target == '-' else open(target, 'w')
+    suffixes = [f",{name}\n" for name in LABELS]
+    totals = np.zeros(len(LABELS), dtype=np.int64)
+    count = 0
+    start = time.perf_counter()
+    try:
+        for rows, codes in stream_classified(stream, block_bytes, table):
+            if codes is None:
+                out.write(rows[0] + ',label\n')
+                continue
+            # سطر و برچسبش یک در میان در یک لیست و یک join
+            parts = [None] * (2 * len(rows))
+            parts[0::2] = rows
+            parts[1::2] = map(suffixes.__getitem__, codes.tolist())
+            out.write(''.join(parts))
+            totals += np.bincount(codes, minlength=len(LABELS))
+            count += len(rows)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0
+    print(f"{count} readings in {elapsed:.2f}s ({rate:,.0f} rows/s)", file=sys.stderr)
+    for name, total in zip(LABELS, totals.tolist()):
+        print(f"  {name:<12} {total}", file=sys.stderr)
+    return count
+
+
+def format_bound(value):
+    if not math.isfinite(value):
+        return '-inf' if value < 0 else 'inf'
+    return str(int(value)) if value == int(value) else str(value)
+
+
+def format_gap(lower, lower_closed, upper, upper_closed):
+    left = '[' if lower_closed and math.isfinite(lower) else '('
+    right = ']' if upper_closed and math.isfinite(upper) else ')'
+    return f"{left}{format_bound(lower)}, {format_bound(upper)}{right}"
+
+
+def check(table=DEFAULT_TABLE, out=sys.stdout):
+    gaps = table.uncovered()
+    for kind, *gap in gaps:
+        print(f"{TYPE_NAMES[kind]}: {format_gap(*gap)} is not covered", file=out)
+    if not gaps:
+        print("all readings are covered", file=out)
+    return gaps
+
+
+def benchmark(table=DEFAULT_TABLE, n=1_000_000, seed=0):
+    rng = np.random.default_rng(seed)
+    # نیمی از خوانش‌ها اعشاری تا حدهای باز و بسته هم آزموده شوند
+    values = rng.integers(0, 400, n) + rng.choice([0.0, 0.0, 0.25, 0.5, 0.75], n)
+    kinds = rng.integers(1, 3, n).astype(np.int8)
+    pairs = list(zip(values.tolist(), kinds.tolist()))
+    float_values = values
+
+    expected = [table.classify_one(v, k) for v, k in pairs]
+    matches_homework = expected == [classify_if_chain(v, k) for v, k in pairs]
+    results = {
+        'if-chain': lambda: [classify_if_chain(v, k) for v, k in pairs],
+        'bisect': lambda: [table.classify_one(v, k) for v, k in pairs],
+        'dense lookup': lambda: [table.lookup(v, k) for v, k in pairs],
+        'searchsorted batch': lambda: table.classify_sorted(float_values, kinds),
+        'dense batch': lambda: table.classify(float_values, kinds),
+    }
+    for name, run in results.items():
+        # همه روش‌های جدول باید همان جواب را بدهند؛ if-chain فقط با حدهای homework یکی است
+        if name != 'if-chain':
+            assert list(np.asarray(run()).tolist()) == expected, name
+        elapsed = min(timeit.repeat(run, number=1, repeat=3))
+        print(f"{name:<20} {elapsed * 1e9 / n:8.1f}ns/reading  {n / elapsed:14,.0f} readings/s")
+    print(f"thresholds match the homework if-chain: {'yes' if matches_homework else 'no'}")
+
+
+def main(argv):
+    # python glucose.py [--thresholds file.json] [--check | --benchmark] [ورودی.csv یا -] [خروجی.csv یا -]
+    parser = argparse.ArgumentParser(description="دسته‌بندی خوانش‌های قند خون")
+    parser.add_argument('--thresholds', help="فایل JSON حدها")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument('--check', action='store_true', help="بازه‌های بی‌دسته را نشان بده")
+    action.add_argument('--benchmark', action='store_true', help="مقایسه روش‌های دسته‌بندی")
+    parser.add_argument('source', nargs='?', default='-', help="CSV ورودی (پیش‌فرض stdin)")
+    parser.add_argument('target', nargs='?', default='-', help="CSV خروجی (پیش‌فرض stdout)")
+    args = parser.parse_args(argv)
+
+    table = DEFAULT_TABLE
+    if args.thresholds:
+        try:
+            table = ThresholdTable.from_file(args.thresholds)
+        except (OSError, ValueError) as e:
+            parser.error(f"{args.thresholds}: {e}")
+    if args.check:
+        check(table)
+    elif args.benchmark:
+        benchmark(table)
+    else:
+        try:
+            run_batch(args.source, args.target, table=table)
+        except OSError as e:
+            parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,266 @@
+import sys
+import json
+import argparse
+import math
+import time
+import asyncio
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+from glucose import DEFAULT_RANGES, LABELS, TYPE_CODES, ThresholdTable, load_ranges
+
+MAX_BATCH = 512
+MAX_WAIT = 0.0005
+
+
+class MicroBatcher:
+    # درخواست‌های تکی جمع می‌شوند و هر دسته با یک classify برداری جواب می‌گیرد؛
+    # دسته وقتی بسته می‌شود که پر شود یا MAX_WAIT از اولین درخواستش گذشته باشد
+    def __init__(self, table, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.table = table
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.full = asyncio.Event()
+        self.requests = 0
+        self.batches = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def classify(self, value, kind):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((value, kind, future))
+        if self.queue.qsize() >= self.max_batch:
+            self.full.set()
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            # یک بار صبر برای کل دسته (نه برای تک‌تک درخواست‌ها)؛ با max_wait صفر
+            # فقط درخواست‌هایی که همین حالا آماده‌اند به دسته می‌رسند
+            self.full.clear()
+            if self.max_wait > 0 and self.queue.qsize() < self.max_batch - 1:
+                try:
+                    await asyncio.wait_for(self.full.wait(), self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(0)
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            values = np.fromiter((item[0] for item in batch), np.float64, len(batch))
+            kinds = np.fromiter((item[1] for item in batch), np.int8, len(batch))
+            codes = self.table.classify(values, kinds).tolist()
+            for (_, _, future), code in zip(batch, codes):
+                if not future.done():
+                    future.set_result(code)
+            self.requests += len(batch)
+            self.batches += 1
+
+
+def http_response(status, payload, keep_alive=True):
+    body = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode()
+    reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 431: 'Request Header Fields Too Large'}[status]
+    head = (
+        f"HTTP/1.1 {status} {reason}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+class GlucoseService:
+    # GET /classify?reading=110&type=1 → {"label": "pish dyabet", ...}
+    # GET /stats → تعداد درخواست‌ها و میانگین اندازه دسته‌ها
+    def __init__(self, table=None, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.batcher = MicroBatcher(table or ThresholdTable(), max_batch, max_wait)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    # سرآیند بیشتر از حد بافر (64KB)؛ باقی آن خوانده نشده، پس اتصال بسته می‌شود
+                    writer.write(http_response(431, {'error': 'headers too large'}, keep_alive=False))
+                    await writer.drain()
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                method, target, _ = (lines[0].split(' ') + ['', ''])[:3]
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    length = int(headers.get('content-length') or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    # بدون طول درست مرز درخواست بعدی معلوم نیست، پس اتصال بسته می‌شود
+                    writer.write(http_response(400, {'error': 'invalid Content-Length'}, keep_alive=False))
+                    await writer.drain()
+                    break
+                try:
+                    body = await reader.readexactly(length) if length else b''
+                except asyncio.IncompleteReadError:
+                    break
+
+                status, payload = await self.route(method, target, body)
+                writer.write(http_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def route(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == '/stats':
+            batches = self.batcher.batches
+            return 200, {
+                'requests': self.batcher.requests,
+                'batches': batches,
+                'mean_batch': self.batcher.requests / batches if batches else 0,
+            }
+        if url.path != '/classify':
+            return 404, {'error': 'not found'}
+
+        try:
+            params = parse_qs(body.decode() if method == 'POST' else url.query)
+        except UnicodeDecodeError:
+            return 400, {'error': 'body must be UTF-8'}
+        try:
+            value = float(params['reading'][0])
+            kind = TYPE_CODES[params.get('type', ['1'])[0]]
+            if not math.isfinite(value):
+                raise ValueError(value)
+        except (KeyError, ValueError):
+            return 400, {'error': 'reading (number) and type (1 or 2) are required'}
+        code = await self.batcher.classify(value, kind)
+        return 200, {'reading': value, 'type': kind, 'label': LABELS[code]}
+
+    async def serve(self, host='127.0.0.1', port=8080, unix=None):
+        self.batcher.start()
+        if unix:
+            server = await asyncio.start_unix_server(self.handle, path=unix)
+            where = unix
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            where = f"http://{host}:{port}"
+        print(f"glucose service on {where}", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+async def open_client(host, port, unix):
+    if unix:
+        return await asyncio.open_unix_connection(unix)
+    return await asyncio.open_connection(host, port)
+
+
+async def request(reader, writer, target):
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    length = 0
+    for line in head.decode('latin-1').split('\r\n'):
+        name, _, value = line.partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return json.loads(await reader.readexactly(length))
+
+
+async def load_test(host='127.0.0.1', port=8080, unix=None, connections=64, requests=20000, seed=0):
+    # هر اتصال درخواست‌هایش را پشت سر هم (keep-alive) می‌فرستد
+    rng = np.random.default_rng(seed)
+    values = rng.integers(40, 300, requests).tolist()
+    kinds = rng.integers(1, 3, requests).tolist()
+    latencies = np.zeros(requests)
+    next_index = iter(range(requests))
+
+    async def client():
+        reader, writer = await open_client(host, port, unix)
+        try:
+            for i in next_index:
+                sent = time.perf_counter()
+                await request(reader, writer, f"/classify?reading={values[i]}&type={kinds[i]}")
+                latencies[i] = time.perf_counter() - sent
+        finally:
+            writer.close()
+
+    reader, writer = await open_client(host, port, unix)
+    before = await request(reader, writer, "/stats")
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    after = await request(reader, writer, "/stats")
+    writer.close()
+    # فقط دسته‌های همین اجرا (بدون دو درخواست stats)
+    batches = after['batches'] - before['batches']
+    mean_batch = (after['requests'] - before['requests']) / batches if batches else 0
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(
+        f"{requests} requests over {connections} connections in {elapsed:.2f}s "
+        f"({requests / elapsed:,.0f} req/s); p50 {p50:.2f}ms p99 {p99:.2f}ms; "
+        f"server mean batch {mean_batch:.1f}"
+    )
+    return p50, p99, requests / elapsed
+
+
+def main(argv):
+    # سرویس: python glucose_service.py [--port n | --unix path] [--thresholds file.json] [--max-batch n] [--max-wait-ms n]
+    # بار: python glucose_service.py --load [--port n | --unix path] [--connections n] [--requests n]
+    parser = argparse.ArgumentParser(description="سرویس HTTP دسته‌بندی قند خون با micro-batching")
+    parser.add_argument('--load', action='store_true', help="به جای سرویس، آزمون بار روی سرویس در حال اجرا")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--unix', help="سوکت یونیکس به جای TCP")
+    parser.add_argument('--connections', type=int, default=64, help="اتصال‌های هم‌زمان آزمون بار")
+    parser.add_argument('--requests', type=int, default=20000, help="کل درخواست‌های آزمون بار")
+    parser.add_argument('--thresholds', help="فایل JSON حدها")
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH, help="بیشترین اندازه دسته")
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT * 1000, help="بیشترین انتظار دسته به میلی‌ثانیه")
+    args = parser.parse_args(argv)
+    if args.connections < 1 or args.requests < 1 or args.max_batch < 1:
+        parser.error("--connections، --requests و --max-batch باید مثبت باشند")
+    if args.max_wait_ms < 0:
+        parser.error("--max-wait-ms نمی‌تواند منفی باشد")
+    options = {'host': args.host, 'port': args.port, 'unix': args.unix}
+
+    if args.load:
+        asyncio.run(load_test(connections=args.connections, requests=args.requests, **options))
+        return
+    ranges = DEFAULT_RANGES
+    if args.thresholds:
+        try:
+            ranges = load_ranges(args.thresholds)
+        except (OSError, ValueError) as e:
+            parser.error(f"{args.thresholds}: {e}")
+    service = GlucoseService(ThresholdTable(ranges), args.max_batch, args.max_wait_ms / 1000)
+    try:
+        asyncio.run(service.serve(**options))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
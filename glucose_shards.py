@@ -0,0 +1,253 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+from glucose import BLOCK_BYTES, DEFAULT_RANGES, LABELS, ThresholdTable, load_ranges, split_header
+from glucose_stats import RANGE_LOW, RANGE_HIGH, estimated_hba1c, is_readings_header, parse_readings
+
+SHARD_BYTES = 32 * 1024 * 1024
+
+# ستون‌های جمع‌بندی هر بیمار؛ همه قابل ادغام بین تکه‌ها هستند
+COUNT, SUM, MIN, MAX, IN_RANGE, FIRST_TIME, LAST_TIME = range(7)
+LABEL_COLUMNS = 7
+COLUMNS = LABEL_COLUMNS + len(LABELS)
+SUMMED = [COUNT, SUM, IN_RANGE] + list(range(LABEL_COLUMNS, COLUMNS))
+
+
+def split_shards(paths, shard_bytes=SHARD_BYTES):
+    # فقط بازه بایتی؛ هر worker خودش مرز را تا ابتدای خط بعدی جلو می‌برد
+    shards = []
+    for path in paths:
+        size = os.path.getsize(path)
+        for start in range(0, size, shard_bytes):
+            shards.append((path, start, min(start + shard_bytes, size)))
+    return shards
+
+
+def expand_paths(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.endswith('.csv')
+            ))
+        else:
+            files.append(path)
+    return files
+
+
+def shard_blocks(path, start, end, block_bytes=BLOCK_BYTES):
+    # خطی که از start یا قبل از آن شروع شده مال تکه قبلی است و
+    # خطی که قبل از end شروع شده تا آخرش خوانده می‌شود
+    with open(path, 'rb') as f:
+        if start > 0:
+            f.seek(start - 1)
+            if f.read(1) != b'\n':
+                f.readline()
+        position = f.tell()
+        carry = b''
+        while position < end:
+            data = f.read(min(block_bytes, end - position))
+            if not data:
+                break
+            position += len(data)
+            data = carry + data
+            if position >= end:
+                if not data.endswith(b'\n'):
+                    data += f.readline()
+                carry = b''
+                cut = len(data.rstrip(b'\n'))
+            else:
+                cut = data.rfind(b'\n')
+                if cut == -1:
+                    carry = data
+                    continue
+                carry = data[cut + 1:]
+            text = data[:cut].decode('utf-8', errors='replace')
+            if '\r' in text:
+                text = text.replace('\r', '')
+            if text:
+                yield text
+        if carry.strip():
+            yield carry.decode('utf-8', errors='replace').replace('\r', '')
+
+
+class ShardAggregate:
+    # جمع‌بندی بیماران یک تکه در یک آرایه (بیمار × ستون)
+    def __init__(self, capacity=1024):
+        self.ids = {}
+        self.names = []
+        self.data = self._empty(capacity)
+
+    @staticmethod
+    def _empty(capacity):
+        data = np.zeros((capacity, COLUMNS))
+        data[:, [MIN, FIRST_TIME]] = np.inf
+        data[:, [MAX, LAST_TIME]] = -np.inf
+        return data
+
+    def rows(self, names):
+        try:
+            return np.fromiter(map(self.ids.__getitem__, names), np.int64, len(names))
+        except KeyError:
+            for name in dict.fromkeys(names):
+                if name not in self.ids:
+                    self.ids[name] = len(self.names)
+                    self.names.append(name)
+            if len(self.names) > len(self.data):
+                extra = self._empty(max(len(self.names), 2 * len(self.data)) - len(self.data))
+                self.data = np.vstack([self.data, extra])
+            return np.fromiter(map(self.ids.__getitem__, names), np.int64, len(names))
+
+    def add(self, names, times, values, codes):
+        rows = self.rows(names)
+        n = len(self.data)
+        data = self.data
+        data[:, COUNT] += np.bincount(rows, minlength=n)
+        data[:, SUM] += np.bincount(rows, weights=values, minlength=n)
+        in_range = (values >= RANGE_LOW) & (values <= RANGE_HIGH)
+        data[:, IN_RANGE] += np.bincount(rows[in_range], minlength=n)
+        for label in range(len(LABELS)):
+            data[:, LABEL_COLUMNS + label] += np.bincount(rows[codes == label], minlength=n)
+        np.minimum.at(data[:, MIN], rows, values)
+        np.maximum.at(data[:, MAX], rows, values)
+        np.minimum.at(data[:, FIRST_TIME], rows, times)
+        np.maximum.at(data[:, LAST_TIME], rows, times)
+
+    def merge(self, names, data):
+        rows = self.rows(names)
+        target = self.data
+        target[np.ix_(rows, SUMMED)] += data[:, SUMMED]
+        for column, combine in ((MIN, np.minimum), (MAX, np.maximum),
+                                (FIRST_TIME, np.minimum), (LAST_TIME, np.maximum)):
+            target[rows, column] = combine(target[rows, column], data[:, column])
+
+
+def classify_shard(task):
+    # در پروسه worker: خواندن، classify و جمع‌بندی یک تکه؛
+    # نتیجه در shared memory نوشته می‌شود و فقط نام بیماران pickle می‌شود
+    path, start, end, ranges = task
+    table = ThresholdTable(ranges)
+    aggregate = ShardAggregate()
+    count = bad = 0
+    blocks = shard_blocks(path, start, end)
+    if start == 0:
+        _, blocks = split_header(blocks, is_readings_header)
+    for block in blocks:
+        names, times, values, kinds, skipped = parse_readings(block, block.split('\n'))
+        bad += skipped
+        if len(names):
+            aggregate.add(names, times, values, table.classify(values, kinds))
+        count += len(names)
+
+    patients = len(aggregate.names)
+    if patients == 0:
+        return [], None, 0, count, bad
+    memory = create_untracked(patients * COLUMNS * 8)
+    np.ndarray((patients, COLUMNS), dtype=np.float64, buffer=memory.buf)[:] = aggregate.data[:patients]
+    memory.close()
+    return aggregate.names, memory.name, patients, count, bad
+
+
+def create_untracked(size):
+    # پاک کردن حافظه با read_shared در پروسه اصلی است، نه با خروج پروسه worker
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(create=True, size=size, track=False)
+    memory = shared_memory.SharedMemory(create=True, size=size)
+    if os.name == 'posix':
+        # فقط در POSIX ثبت می‌شود، با همان / اولی که name برنمی‌گرداند
+        resource_tracker.unregister('/' + memory.name, 'shared_memory')
+    return memory
+
+
+def read_shared(name, patients):
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray((patients, COLUMNS), dtype=np.float64, buffer=memory.buf).copy()
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def run(paths, target='-', workers=None, shard_bytes=SHARD_BYTES, ranges=DEFAULT_RANGES):
+    shards = split_shards(expand_paths(paths), shard_bytes)
+    workers = workers or os.cpu_count() or 1
+    total = ShardAggregate()
+    count = bad = 0
+    start = time.perf_counter()
+    tasks = [(path, begin, end, ranges) for path, begin, end in shards]
+    with multiprocessing.Pool(workers) as pool:
+        for names, memory_name, patients, shard_count, shard_bad in pool.imap_unordered(classify_shard, tasks):
+            count += shard_count
+            bad += shard_bad
+            if memory_name is not None:
+                total.merge(names, read_shared(memory_name, patients))
+    elapsed = time.perf_counter() - start
+
+    write_summary(total, target)
+    rate = count / elapsed if elapsed > 0 else 0
+    print(
+        f"{count} readings, {len(total.names)} patients, {len(shards)} shards, {workers} workers "
+        f"in {elapsed:.2f}s ({rate:,.0f} rows/s); {bad} bad rows",
+        file=sys.stderr,
+    )
+    return total
+
+
+def write_summary(aggregate, target='-'):
+    patients = len(aggregate.names)
+    data = aggregate.data[:patients]
+    order = sorted(range(patients), key=aggregate.names.__getitem__)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = data[:, SUM] / data[:, COUNT]
+        tir = 100.0 * data[:, IN_RANGE] / data[:, COUNT]
+    hba1c = estimated_hba1c(mean)
+
+    out = sys.stdout if target == '-' else open(target, 'w')
+    try:
+        out.write(','.join(['patient', 'count', 'mean', 'min', 'max', 'tir', 'ehba1c',
+                            'first_time', 'last_time', *LABELS]) + '\n')
+        for i in order:
+            row = data[i]
+            out.write(
+                f"{aggregate.names[i]},{int(row[COUNT])},{mean[i]:.2f},{row[MIN]:g},{row[MAX]:g},"
+                f"{tir[i]:.2f},{hba1c[i]:.2f},{int(row[FIRST_TIME])},{int(row[LAST_TIME])},"
+                + ','.join(str(int(v)) for v in row[LABEL_COLUMNS:]) + '\n'
+            )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def main(argv):
+    # python glucose_shards.py [--workers n] [--shard-mb n] [--thresholds file.json] [--out file] فایل یا پوشه ...
+    parser = argparse.ArgumentParser(description="دسته‌بندی و آمار فایل‌های بزرگ خوانش به صورت موازی")
+    parser.add_argument('paths', nargs='+', help="فایل‌ها یا پوشه‌های CSV")
+    parser.add_argument('--workers', type=int, help="تعداد پردازه‌ها (پیش‌فرض تعداد CPU)")
+    parser.add_argument('--shard-mb', type=float, default=SHARD_BYTES / (1024 * 1024), help="اندازه هر تکه به مگابایت")
+    parser.add_argument('--thresholds', help="فایل JSON حدها")
+    parser.add_argument('--out', default='-', help="CSV خروجی (پیش‌فرض stdout)")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers باید مثبت باشد")
+    shard_bytes = int(args.shard_mb * 1024 * 1024)
+    if shard_bytes < 1:
+        parser.error("--shard-mb باید مثبت باشد")
+
+    ranges = DEFAULT_RANGES
+    if args.thresholds:
+        try:
+            ranges = load_ranges(args.thresholds)
+        except (OSError, ValueError) as e:
+            parser.error(f"{args.thresholds}: {e}")
+    try:
+        run(args.paths, args.out, args.workers, shard_bytes, ranges)
+    except OSError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,281 @@
+import os
+import sys
+import time
+import argparse
+import itertools
+import numpy as np
+from glucose import BLOCK_BYTES, TYPE_CODES, read_blocks, split_header
+
+# پنجره‌ها: (نام، طول به ثانیه، عرض هر خانه به ثانیه)؛
+# هر پنجره یک حلقه از خانه‌های زمانی است، پس دقت آن به اندازه عرض یک خانه است
+WINDOWS = (
+    ('24h', 24 * 3600, 3600),
+    ('14d', 14 * 86400, 6 * 3600),
+    ('90d', 90 * 86400, 86400),
+)
+
+# بازه هدف برای time-in-range (mg/dL)
+RANGE_LOW = 70
+RANGE_HIGH = 180
+
+NO_BUCKET = -2 ** 62
+
+
+def estimated_hba1c(mean):
+    # فرمول ADAG: HbA1c = (میانگین + 46.7) / 28.7
+    return (mean + 46.7) / 28.7
+
+
+class RollingWindow:
+    # برای هر بیمار یک سطر در آرایه‌ها؛ جمع کل پنجره جدا نگه داشته می‌شود
+    # و با جلو رفتن زمان فقط خانه‌های قدیمی از آن کم می‌شوند
+    def __init__(self, span, width, capacity=1024):
+        self.span = span
+        self.width = width
+        self.size = span // width
+        self.sums = np.zeros((capacity, self.size))
+        self.counts = np.zeros((capacity, self.size), dtype=np.int32)
+        self.in_range = np.zeros((capacity, self.size), dtype=np.int32)
+        self.total_sum = np.zeros(capacity)
+        self.total_count = np.zeros(capacity, dtype=np.int64)
+        self.total_in_range = np.zeros(capacity, dtype=np.int64)
+        self.head = np.full(capacity, NO_BUCKET, dtype=np.int64)
+
+    def grow(self, capacity):
+        extra = capacity - len(self.head)
+        self.sums = np.vstack([self.sums, np.zeros((extra, self.size))])
+        self.counts = np.vstack([self.counts, np.zeros((extra, self.size), dtype=np.int32)])
+        self.in_range = np.vstack([self.in_range, np.zeros((extra, self.size), dtype=np.int32)])
+        self.total_sum = np.concatenate([self.total_sum, np.zeros(extra)])
+        self.total_count = np.concatenate([self.total_count, np.zeros(extra, dtype=np.int64)])
+        self.total_in_range = np.concatenate([self.total_in_range, np.zeros(extra, dtype=np.int64)])
+        self.head = np.concatenate([self.head, np.full(extra, NO_BUCKET, dtype=np.int64)])
+
+    def add(self, patients, touched, local, times, values, in_range):
+        # یک دسته خوانش؛ هزینه هر خوانش ثابت است (هر خانه در هر دور فقط یک بار پاک می‌شود)
+        # touched: بیماران این دسته، local: جای بیمار هر خوانش در touched
+        buckets = times // self.width
+        latest = np.full(len(touched), NO_BUCKET, dtype=np.int64)
+        np.maximum.at(latest, local, buckets)
+        old = self.head[touched]
+        head = np.maximum(old, latest)
+        self._expire(touched, old, np.minimum(head - old, self.size))
+        self.head[touched] = head
+
+        # خوانش‌هایی که از پنجره بیرون افتاده‌اند حساب نمی‌شوند
+        keep = buckets > head[local] - self.size
+        rows = patients[keep]
+        slots = buckets[keep] % self.size
+        values = values[keep]
+        in_range = in_range[keep]
+        local = local[keep]
+
+        cells, cell_index = np.unique(rows * self.size + slots, return_inverse=True)
+        cell_rows, cell_slots = np.divmod(cells, self.size)
+        self.sums[cell_rows, cell_slots] += np.bincount(cell_index, weights=values)
+        self.counts[cell_rows, cell_slots] += np.bincount(cell_index).astype(np.int32)
+        self.in_range[cell_rows, cell_slots] += np.bincount(cell_index, weights=in_range).astype(np.int32)
+
+        n = len(touched)
+        self.total_sum[touched] += np.bincount(local, weights=values, minlength=n)
+        self.total_count[touched] += np.bincount(local, minlength=n)
+        self.total_in_range[touched] += np.bincount(local, weights=in_range, minlength=n).astype(np.int64)
+
+    def _expire(self, touched, old, advance):
+        # خانه‌های old+1 تا old+advance هر بیمار پاک و از جمع کل کم می‌شوند
+        total = int(advance.sum())
+        if total == 0:
+            return
+        owner = np.repeat(np.arange(len(touched)), advance)
+        starts = np.repeat(old + 1 - (np.cumsum(advance) - advance), advance)
+        slots = (starts + np.arange(total)) % self.size
+        rows = touched[owner]
+        n = len(touched)
+        self.total_sum[touched] -= np.bincount(owner, weights=self.sums[rows, slots], minlength=n)
+        self.total_count[touched] -= np.bincount(owner, weights=self.counts[rows, slots], minlength=n).astype(np.int64)
+        self.total_in_range[touched] -= np.bincount(owner, weights=self.in_range[rows, slots], minlength=n).astype(np.int64)
+        self.sums[rows, slots] = 0
+        self.counts[rows, slots] = 0
+        self.in_range[rows, slots] = 0
+
+    def mean(self, count):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.total_sum[:count] / self.total_count[:count]
+
+    def time_in_range(self, count):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return 100.0 * self.total_in_range[:count] / self.total_count[:count]
+
+
+class PatientStats:
+    def __init__(self, windows=WINDOWS, capacity=1024):
+        self.ids = {}
+        self.names = []
+        self.capacity = capacity
+        self.last_time = np.full(capacity, NO_BUCKET, dtype=np.int64)
+        self.windows = {name: RollingWindow(span, width, capacity) for name, span, width in windows}
+        self.longest = max(span for _, span, _ in windows)
+        self.late = 0
+
+    def patient_rows(self, names):
+        try:
+            return np.fromiter(map(self.ids.__getitem__, names), np.int64, len(names))
+        except KeyError:
+            for name in dict.fromkeys(names):
+                self._row(name)
+            return np.fromiter(map(self.ids.__getitem__, names), np.int64, len(names))
+
+    def _row(self, name):
+        row = self.ids.get(name)
+        if row is None:
+            row = self.ids[name] = len(self.names)
+            self.names.append(name)
+            if row >= self.capacity:
+                self.capacity *= 2
+                for window in self.windows.values():
+                    window.grow(self.capacity)
+                extra = self.capacity - len(self.last_time)
+                self.last_time = np.concatenate([self.last_time, np.full(extra, NO_BUCKET, dtype=np.int64)])
+        return row
+
+    def add(self, names, times, values):
+        patients = self.patient_rows(names)
+        in_range = ((values >= RANGE_LOW) & (values <= RANGE_HIGH)).astype(np.float64)
+        # دیر رسیده: قدیمی‌تر از بلندترین پنجره نسبت به آخرین خوانش قبلی همان بیمار
+        self.late += int(np.count_nonzero(times <= self.last_time[patients] - self.longest))
+        np.maximum.at(self.last_time, patients, times)
+        touched, local = np.unique(patients, return_inverse=True)
+        for window in self.windows.values():
+            window.add(patients, touched, local, times, values, in_range)
+
+    def snapshot(self, path):
+        count = len(self.names)
+        columns = [np.array(self.names, dtype=object), self.last_time[:count]]
+        header = ['patient', 'last_time']
+        for name, window in self.windows.items():
+            mean = window.mean(count)
+            columns += [window.total_count[:count], mean, window.time_in_range(count), estimated_hba1c(mean)]
+            header += [f'count_{name}', f'mean_{name}', f'tir_{name}', f'ehba1c_{name}']
+
+        lines = [','.join(header)]
+        for row in zip(*(column.tolist() for column in columns)):
+            lines.append(','.join(f'{v:.2f}' if isinstance(v, float) else str(v) for v in row))
+        # فایل قبلی تا آخرین لحظه سالم می‌ماند
+        temp = path + '.tmp'
+        with open(temp, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temp, path)
+
+
+def is_readings_header(row):
+    # ستون خوانش (سوم) عدد نیست
+    try:
+        float(row.split(',')[2])
+        return False
+    except (ValueError, IndexError):
+        return True
+
+
+def parse_times(fields):
+    # ثانیه یونیکس یا تاریخ ISO مثل 2024-01-31T08:00:00
+    try:
+        return np.array(fields, dtype=np.float64).astype(np.int64)
+    except ValueError:
+        return np.array(fields, dtype='datetime64[s]').astype(np.int64)
+
+
+def parse_readings(block, rows):
+    # هر سطر: "بیمار,زمان,خوانش" (ستون چهارم، نوع اندازه‌گیری، اختیاری است و بدون آن 0 می‌شود)
+    count = len(rows)
+    columns = rows[0].count(',') + 1
+    fields = block.replace('\n', ',').split(',')
+    # تعداد کل فیلدها کافی نیست (سطر کوتاه و سطر بلند همدیگر را جبران می‌کنند)
+    if (columns in (3, 4) and len(fields) == columns * count
+            and all(map((columns - 1).__eq__, map(str.count, rows, itertools.repeat(','))))):
+        try:
+            if columns == 4:
+                kinds = np.fromiter(map(TYPE_CODES.get, map(str.strip, fields[3::4]), itertools.repeat(0)), np.int8, count)
+            else:
+                kinds = np.zeros(count, dtype=np.int8)
+            return (
+                list(map(str.strip, fields[0::columns])),
+                parse_times(list(map(str.strip, fields[1::columns]))),
+                np.array(fields[2::columns], dtype=np.float64),
+                kinds,
+                0,
+            )
+        except ValueError:
+            pass
+
+    # سطرهای خراب کنار گذاشته می‌شوند
+    names, times, values, kinds = [], [], [], []
+    for row in rows:
+        parts = row.split(',')
+        if len(parts) not in (3, 4):
+            continue
+        try:
+            time_value = parse_times([parts[1].strip()])[0]
+            value = float(parts[2])
+        except ValueError:
+            continue
+        names.append(parts[0].strip())
+        times.append(time_value)
+        values.append(value)
+        kinds.append(TYPE_CODES.get(parts[3].strip(), 0) if len(parts) == 4 else 0)
+    return (
+        names,
+        np.array(times, dtype=np.int64),
+        np.array(values, dtype=np.float64),
+        np.array(kinds, dtype=np.int8),
+        count - len(names),
+    )
+
+
+def run(source='-', snapshot_path='glucose_stats.csv', every=10.0, block_bytes=BLOCK_BYTES):
+    stream = sys.stdin if source == '-' else open(source)
+    stats = PatientStats()
+    count = bad = 0
+    start = last_snapshot = time.perf_counter()
+    try:
+        _, blocks = split_header(read_blocks(stream, block_bytes), is_readings_header)
+        for block in blocks:
+            names, times, values, _, skipped = parse_readings(block, block.split('\n'))
+            bad += skipped
+            if len(names):
+                stats.add(names, times, values)
+            count += len(names)
+
+            now = time.perf_counter()
+            if now - last_snapshot >= every:
+                stats.snapshot(snapshot_path)
+                last_snapshot = now
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    stats.snapshot(snapshot_path)
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0
+    print(
+        f"{count} readings, {len(stats.names)} patients in {elapsed:.2f}s ({rate:,.0f} rows/s); "
+        f"{bad} bad rows, {stats.late} late readings dropped",
+        file=sys.stderr,
+    )
+    return stats
+
+
+def main(argv):
+    # python glucose_stats.py [ورودی.csv یا -] [--snapshot فایل] [--every ثانیه]
+    parser = argparse.ArgumentParser(description="آمار پنجره‌ای خوانش‌های قند خون هر بیمار")
+    parser.add_argument('source', nargs='?', default='-', help="CSV ورودی (پیش‌فرض stdin)")
+    parser.add_argument('--snapshot', default='glucose_stats.csv', help="فایل خلاصه آمار")
+    parser.add_argument('--every', type=float, default=10.0, help="فاصله نوشتن خلاصه به ثانیه")
+    args = parser.parse_args(argv)
+    try:
+        run(args.source, args.snapshot, args.every)
+    except OSError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
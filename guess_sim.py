@@ -0,0 +1,145 @@
+import sys
+import time
+import argparse
+import multiprocessing
+import numpy as np
+
+CHUNK_GAMES = 1_000_000
+
+
+class RandomStrategy:
+    # مثل بازیکن homework3: هر بار یک عدد تصادفی از کل بازه، بدون توجه به راهنما
+    def __init__(self, low, high, **options):
+        self.low = low
+        self.high = high
+
+    def guess(self, lo, hi, rng, turn):
+        return rng.integers(self.low, self.high, len(lo), endpoint=True)
+
+
+class FixedStrategy:
+    # همیشه همان عدد (پیش‌فرض کوچک‌ترین عدد بازه)
+    def __init__(self, low, high, value=None, **options):
+        self.value = low if value is None else value
+
+    def guess(self, lo, hi, rng, turn):
+        return np.full(len(lo), self.value, dtype=np.int64)
+
+
+class BinaryStrategy:
+    # با راهنمای "بزرگ‌تر/کوچک‌تر" وسط بازه ممکن را حدس می‌زند
+    def __init__(self, low, high, **options):
+        pass
+
+    def guess(self, lo, hi, rng, turn):
+        return lo + (hi - lo) // 2
+
+
+STRATEGIES = {
+    'random': RandomStrategy,
+    'fixed': FixedStrategy,
+    'binary': BinaryStrategy,
+}
+
+
+def play(strategy, games, low, high, max_guesses, rng):
+    # همه بازی‌ها با هم؛ حلقه فقط روی نوبت‌هاست و بازی‌های تمام شده از آرایه‌ها بیرون می‌روند
+    secret = rng.integers(low, high, games, endpoint=True)
+    lo = np.full(games, low, dtype=np.int64)
+    hi = np.full(games, high, dtype=np.int64)
+    wins_by_turn = np.zeros(max_guesses + 1, dtype=np.int64)
+    for turn in range(1, max_guesses + 1):
+        if len(secret) == 0:
+            break
+        guess = strategy.guess(lo, hi, rng, turn)
+        hit = guess == secret
+        wins_by_turn[turn] = np.count_nonzero(hit)
+        left = ~hit
+        secret, guess, lo, hi = secret[left], guess[left], lo[left], hi[left]
+        lo = np.where(guess < secret, np.maximum(lo, guess + 1), lo)
+        hi = np.where(guess > secret, np.minimum(hi, guess - 1), hi)
+    return wins_by_turn
+
+
+def play_chunk(task):
+    name, options, games, low, high, max_guesses, seed = task
+    strategy = STRATEGIES[name](low, high, **options)
+    return play(strategy, games, low, high, max_guesses, np.random.default_rng(seed))
+
+
+def simulate(name='binary', games=1_000_000, low=1, high=10, max_guesses=1, workers=1,
+             seed=0, chunk_games=CHUNK_GAMES, **options):
+    # هر تکه جریان تصادفی مستقل خودش را از SeedSequence دارد، پس نتیجه
+    # به تعداد workerها بستگی ندارد و با همان seed دوباره همان می‌شود
+    if name not in STRATEGIES:
+        raise ValueError(f"استراتژی ناشناخته: {name}")
+    if low > high or max_guesses < 1:
+        raise ValueError("بازه یا تعداد حدس نامعتبر است")
+    if games < 1 or chunk_games < 1:
+        raise ValueError("تعداد بازی‌ها باید دست کم 1 باشد")
+    sizes = [chunk_games] * (games // chunk_games)
+    if games % chunk_games:
+        sizes.append(games % chunk_games)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(name, options, size, low, high, max_guesses, s) for size, s in zip(sizes, seeds)]
+
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(play_chunk, tasks)
+    else:
+        results = map(play_chunk, tasks)
+    return sum(results, np.zeros(max_guesses + 1, dtype=np.int64))
+
+
+def report(wins_by_turn, games, out=sys.stdout):
+    wins = int(wins_by_turn.sum())
+    print(f"win rate {wins / games:.6f} ({wins}/{games})", file=out)
+    if wins:
+        turns = np.arange(len(wins_by_turn))
+        mean = (turns * wins_by_turn).sum() / wins
+        print(f"mean guesses per win {mean:.4f}", file=out)
+    print("guesses  wins        share", file=out)
+    for turn, count in enumerate(wins_by_turn.tolist()):
+        if turn and count:
+            print(f"{turn:>7}  {count:<10}  {count / games:.6f}", file=out)
+    print(f"{'lost':>7}  {games - wins:<10}  {(games - wins) / games:.6f}", file=out)
+
+
+def game_count(text):
+    # 1e6 هم پذیرفته می‌شود
+    try:
+        return int(float(text))
+    except OverflowError:
+        raise ValueError(text)
+
+
+def main(argv):
+    # python guess_sim.py [--strategy random|fixed|binary] [--games n] [--range a b]
+    #                     [--guesses k] [--value x] [--workers n] [--seed s]
+    parser = argparse.ArgumentParser(description="شبیه‌سازی بازی حدس عدد")
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='random')
+    parser.add_argument('--games', type=game_count, default=1_000_000)
+    parser.add_argument('--range', type=int, nargs=2, default=[1, 10], metavar=('LOW', 'HIGH'))
+    parser.add_argument('--guesses', type=int, default=1, help="تعداد حدس در هر بازی")
+    parser.add_argument('--value', type=int, help="عدد ثابت استراتژی fixed")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    settings = {'name': args.strategy, 'games': args.games, 'low': args.range[0], 'high': args.range[1],
+                'max_guesses': args.guesses, 'workers': args.workers, 'seed': args.seed}
+    if args.value is not None:
+        settings['value'] = args.value
+
+    start = time.perf_counter()
+    try:
+        wins_by_turn = simulate(**settings)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+    report(wins_by_turn, settings['games'])
+    rate = settings['games'] / elapsed if elapsed > 0 else 0
+    print(f"{settings['games']} games in {elapsed:.2f}s ({rate:,.0f} games/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,151 @@
+import io
+import ast
+import sqlite3
+import tokenize
+import threading
+import queue
+import time
+from collections import OrderedDict
+
+
+def _tokens(text):
+    # توکن‌های پایتون تا جایی که متن (مثلا یک پیشوند نیمه‌کاره) قابل خواندن است
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(text).readline):
+            if token.string.strip():
+                yield token.string
+    except (tokenize.TokenError, IndentationError):
+        return
+
+
+def normalize(expression):
+    # فاصله بین توکن‌ها در نتیجه تاثیری ندارد، پس "2 + 3" و "2+3" یکی هستند؛
+    # ولی "1 0" با "10" یکی نیست. عبارتی که parse نشود کلید ندارد (None)
+    try:
+        ast.parse(expression, mode='eval')
+    except (SyntaxError, ValueError):
+        return None
+    return ' '.join(_tokens(expression))
+
+
+class CalculationHistory:
+    BATCH_SIZE = 500
+    FLUSH_INTERVAL = 0.5
+    MEMO_SIZE = 10000
+
+    def __init__(self, path="history.db", on_written=None):
+        self.path = path
+        # بعد از هر نوشتن دسته‌ای، در thread نویسنده صدا زده می‌شود
+        self.on_written = on_written
+        self._local = threading.local()
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "id INTEGER PRIMARY KEY, expression TEXT NOT NULL, normalized TEXT NOT NULL,"
+            "result TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS history_normalized ON history (normalized)")
+        if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+            # کلیدهای قدیمی همه فاصله‌ها را حذف کرده بودند؛ با توکن‌ها دوباره ساخته می‌شوند
+            rows = conn.execute("SELECT id, expression FROM history").fetchall()
+            conn.executemany(
+                "UPDATE history SET normalized = ? WHERE id = ?",
+                [(normalize(expression) or expression, row_id) for row_id, expression in rows]
+            )
+            conn.execute("PRAGMA user_version = 1")
+        conn.commit()
+
+        # نوشتن در دیتابیس در thread جدا و به صورت دسته‌ای انجام می‌شود
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connection(self):
+        # اتصال sqlite را نمی‌شود بین threadها به اشتراک گذاشت
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key, result):
+        with self._memo_lock:
+            self._memo[key] = result
+            self._memo.move_to_end(key)
+            if len(self._memo) > self.MEMO_SIZE:
+                self._memo.popitem(last=False)
+
+    def lookup(self, expression):
+        key = normalize(expression)
+        if key is None:
+            return None
+        with self._memo_lock:
+            result = self._memo.get(key)
+        if result is not None:
+            return result
+
+        row = self._connection().execute(
+            "SELECT result FROM history WHERE normalized = ? ORDER BY id DESC LIMIT 1", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._remember(key, row[0])
+        return row[0]
+
+    def add(self, expression, result):
+        key = normalize(expression)
+        if key is None:
+            # فقط در تاریخچه می‌ماند و هیچ وقت به عنوان نتیجه آماده برگردانده نمی‌شود
+            key = expression
+        else:
+            self._remember(key, result)
+        self._queue.put((expression, key, result, time.time()))
+
+    def recent(self, limit=50):
+        return self._connection().execute(
+            "SELECT expression, result FROM history ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+
+    def search(self, prefix, limit=50):
+        # جستجوی پیشوندی به شکل بازه تا از ایندکس normalized استفاده شود
+        key = ' '.join(_tokens(prefix))
+        if not key:
+            return self.recent(limit)
+        return self._connection().execute(
+            "SELECT expression, result FROM history WHERE normalized >= ? AND normalized < ? "
+            "ORDER BY normalized LIMIT ?", (key, key + '\uffff', limit)
+        ).fetchall()
+
+    def _write_loop(self):
+        conn = self._connection()
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self.FLUSH_INTERVAL)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [item for item in batch if item is not None]
+            if batch:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO history (expression, normalized, result, created) VALUES (?, ?, ?, ?)",
+                        batch
+                    )
+                if self.on_written is not None:
+                    self.on_written()
+        conn.close()
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
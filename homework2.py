@@ -1,3 +1,13 @@
+import sys
+
+# حالت دسته‌ای: python homework2.py --batch [input.csv] [output.csv]
+# هر خط ورودی به شکل "خوانش,نوع" است، مثلا "110,1" (1 ناشتا، 2 بعد از غذا)
+if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+    import glucose
+    glucose.main(sys.argv[2:])
+    sys.exit()
+
+
 nashta=int(input('1.hasht saat nashta 2.pass az taqzie: '))
 
 gand1=int(input('write your sugar:'))
@@ -1,3 +1,11 @@
+import sys
+
+# شبیه‌سازی: python homework3.py --simulate [--strategy random|fixed|binary] [--games n] [--range a b] [--guesses k]
+if len(sys.argv) > 1 and sys.argv[1] == '--simulate':
+    import guess_sim
+    guess_sim.main(sys.argv[2:])
+    sys.exit()
+
 import random
 computer=random.randint(a=1,b=10)
 guess=int(input("guess the number: "))
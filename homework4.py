@@ -1,6 +1,14 @@
+import sys
+
+# اسکن یک بازه: python homework4.py --scan START STOP [--divisors 3 5] [--values] [--workers n]
+if len(sys.argv) > 1 and sys.argv[1] == '--scan':
+    import divisibility
+    divisibility.main(sys.argv[2:])
+    sys.exit()
+
 for i in range(10):
  num=int(input(f'{i+1} write a number: '))
-if num % 3== 0 or num % 5==0:
-          print('bar 3va5 bakhsh pazir ast')
-else:
-           print('bakhsh pazir nist')    
\ No newline at end of file
+ if num % 3== 0 or num % 5==0:
+           print('bar 3va5 bakhsh pazir ast')
+ else:
+            print('bakhsh pazir nist')    
\ No newline at end of file
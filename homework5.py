@@ -1,4 +1,11 @@
+import sys
 
+# حالت دسته‌ای: python homework5.py --batch [file]
+# هر خط ورودی به شکل "op a b" است، مثلا "+ 2 3" یا "5 4"
+if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+    import calc_core
+    calc_core.run_batch(sys.argv[2] if len(sys.argv) > 2 else '-')
+    sys.exit()
 
 
 while True:
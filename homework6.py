@@ -1,2 +1,7 @@
-e=open(file="C:/Users/GIGABYTE/Desktop",mode="r")
-print(e)
\ No newline at end of file
+import os
+import sys
+import file_ingest
+
+# python homework6.py [فایل یا پوشه ...] [--contents | --details] [--workers n]
+# بدون ورودی پوشه Desktop پیمایش می‌شود (open روی پوشه کار نمی‌کرد)
+file_ingest.main(sys.argv[1:] or [os.path.join(os.path.expanduser("~"), "Desktop")])
@@ -0,0 +1,90 @@
+import os
+import asyncio
+import hashlib
+from PyQt5.QtGui import QImage, QPixmap, QIcon, QColor
+from PyQt5.QtCore import Qt
+import qt_asyncio
+
+
+def load_scaled_image(path, cache_dir, width, height, ratio):
+    # در thread pool اجرا می‌شود؛ فقط QImage (نه QPixmap) بیرون از thread اصلی مجاز است
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    pixel_width = round(width * ratio)
+    pixel_height = round(height * ratio)
+    digest = hashlib.sha1(data).hexdigest()
+    cached = os.path.join(cache_dir, f"{digest}_{pixel_width}x{pixel_height}.png")
+
+    image = QImage(cached)
+    if image.isNull():
+        image = QImage.fromData(data)
+        if image.isNull():
+            return None
+        image = image.scaled(pixel_width, pixel_height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        os.makedirs(cache_dir, exist_ok=True)
+        temp = f"{cached}.{os.getpid()}.tmp"
+        if image.save(temp, "PNG"):
+            os.replace(temp, cached)
+
+    image.setDevicePixelRatio(ratio)
+    return image
+
+
+class ImageService:
+    CACHE_DIR = ".image_cache"
+    PLACEHOLDER_COLOR = "#d0d0d0"
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._pixmaps = {}
+
+    def placeholder(self, width, height):
+        pixmap = QPixmap(width, height)
+        pixmap.fill(QColor(self.PLACEHOLDER_COLOR))
+        return pixmap
+
+    async def load(self, path, width, height, ratio=1.0):
+        key = (path, width, height, ratio)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            image = await qt_asyncio.run_in_executor(
+                load_scaled_image, path, self.cache_dir, width, height, ratio
+            )
+            if image is None:
+                return None
+            pixmap = QPixmap.fromImage(image)
+            self._pixmaps[key] = pixmap
+        return pixmap
+
+    def load_into(self, label, path, width, height):
+        # تا آماده شدن تصویر، یک رنگ ساده نشان داده می‌شود
+        label.setPixmap(self.placeholder(width, height))
+        return qt_asyncio.create_task(self._set_when_ready(label, path, width, height))
+
+    async def _set_when_ready(self, label, path, width, height):
+        pixmap = await self.load(path, width, height, label.devicePixelRatioF())
+        if pixmap is None:
+            return
+        try:
+            label.setPixmap(pixmap)
+        except RuntimeError:
+            # پنجره قبل از آماده شدن تصویر بسته و حذف شده
+            pass
+
+    async def load_icons(self, paths, size, ratio=1.0):
+        pixmaps = await asyncio.gather(*(self.load(path, size, size, ratio) for path in paths))
+        return [QIcon(pixmap) if pixmap is not None else QIcon() for pixmap in pixmaps]
+
+
+_shared_service = None
+
+
+def shared_image_service():
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = ImageService()
+    return _shared_service
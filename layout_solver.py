@@ -0,0 +1,104 @@
+import math
+import timeit
+from functools import lru_cache
+
+# محاسبه چیدمان شبکه‌ای مشترک بین window.py و windowpart2.py و windowpart4.py
+# همه توابع خالص هستند و نتیجه برای ورودی یکسان دوباره حساب نمی‌شود
+
+
+@lru_cache(maxsize=4096)
+def grid_shape(n):
+    if n <= 0:
+        return 0, 0
+    cols = math.ceil(math.sqrt(n))
+    rows = math.ceil(n / cols)
+    return rows, cols
+
+
+@lru_cache(maxsize=256)
+def grid_positions(n):
+    # (سطر، ستون) هر آیتم برای QGridLayout
+    rows, cols = grid_shape(n)
+    return tuple(divmod(i, cols) for i in range(n))
+
+
+@lru_cache(maxsize=4096)
+def best_grid(n, width, height, aspect=16 / 10):
+    # تعداد سطر و ستونی که پنجره‌ای با نسبت aspect بیشترین سطح را در خانه‌اش بگیرد
+    if n <= 0:
+        return 0, 0
+    best = (0, 0, -1.0)
+    for rows in range(1, n + 1):
+        cols = math.ceil(n / rows)
+        if rows > 1 and math.ceil(n / (rows - 1)) == cols:
+            # همان تعداد ستون با سطر کمتر همیشه بهتر است
+            continue
+        fit_width = min(width / cols, height / rows * aspect)
+        used = fit_width * fit_width / aspect
+        if used > best[2]:
+            best = (rows, cols, used)
+    return best[0], best[1]
+
+
+def split_counts(n, areas):
+    # تقسیم n پنجره بین صفحه‌نمایش‌ها به نسبت مساحت (روش بزرگ‌ترین باقیمانده)
+    total = sum(areas)
+    shares = [n * area / total for area in areas]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(range(len(areas)), key=lambda i: shares[i] - counts[i], reverse=True)
+    for i in by_remainder[:n - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+@lru_cache(maxsize=1024)
+def solve_screens(n, screens, aspect=16 / 10, min_cell=0):
+    # screens: چندتایی از (x, y, w, h) هر صفحه‌نمایش؛ بدون Qt قابل آزمایش است
+    if n <= 0:
+        return ()
+    rects = []
+    counts = split_counts(n, [w * h for _, _, w, h in screens])
+    for (x, y, width, height), count in zip(screens, counts):
+        if count == 0:
+            continue
+        rows, cols = best_grid(count, width, height, aspect)
+        cell_width = width // cols
+        cell_height = height // rows
+        if cell_width < min_cell or cell_height < min_cell:
+            return None
+        offset_x = x + (width - cell_width * cols) // 2
+        offset_y = y + (height - cell_height * rows) // 2
+        rects.extend(
+            (offset_x + (i % cols) * cell_width, offset_y + (i // cols) * cell_height, cell_width, cell_height)
+            for i in range(count)
+        )
+    return tuple(rects)
+
+
+def benchmark(sizes=(16, 256, 4096), number=1000):
+    for n in sizes:
+        def cold():
+            grid_shape.cache_clear()
+            grid_positions.cache_clear()
+            grid_positions(n)
+
+        def warm():
+            grid_positions(n)
+
+        cold_time = min(timeit.repeat(cold, number=number, repeat=3)) / number
+        warm_time = min(timeit.repeat(warm, number=number, repeat=3)) / number
+        print(f"n={n:<6} cold {cold_time * 1e6:10.2f}us   memoized {warm_time * 1e6:8.3f}us")
+
+    screens = ((0, 0, 1920, 1040), (1920, 0, 2560, 1400), (-1280, 0, 1280, 984))
+    for n in (16, 300, 1000):
+        def cold():
+            solve_screens.cache_clear()
+            best_grid.cache_clear()
+            solve_screens(n, screens, min_cell=100)
+
+        cold_time = min(timeit.repeat(cold, number=100, repeat=3)) / 100
+        print(f"n={n:<6} screens={len(screens)} cold {cold_time * 1e6:10.2f}us")
+
+
+if __name__ == "__main__":
+    benchmark()
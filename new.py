@@ -1,83 +1,31 @@
 import sys
 import random
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QLineEdit, QPushButton, QLabel, QVBoxLayout
+    QApplication, QWidget, QLineEdit, QPushButton, QLabel, QVBoxLayout, QListWidget, QListWidgetItem
 )
-from PyQt5.QtGui import QPixmap, QIcon, QCursor
-from PyQt5.QtCore import Qt, QSize, QPropertyAnimation, QPoint, QTimer, QEvent, pyqtSignal, QThread
-
-
-class QTimerThread(QThread):
-    update_time = pyqtSignal(str)
-
-    def __init__(self):
-        super().__init__()
-        self.seconds = 0
-        self._running = True
-        
-    def run(self):
-        while self._running:
-            self.sleep(1)
-            self.seconds += 1
-            mins = self.seconds // 60
-            secs = self.seconds % 60
-            self.update_time.emit(f"{mins:02}:{secs:02}")
-
-    def stop(self):
-        self._running = False
-
-
-class FloatingMessage(QLabel):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setStyleSheet(
-            "background-color: rgba(255, 255, 0, 220);"
-            "color: black; font-size: 16pt; border: 2px solid black; border-radius: 10px;"
-            "padding: 10px;"
-        )
-        self.setAlignment(Qt.AlignCenter)
-        self.setFixedSize(300, 50)
-        self.hide()
-
-    def show_message(self, text):
-        self.setText(text)
-        start_x = (self.parent().width() - self.width()) // 2
-        start_y = 0
-        end_y = (self.parent().height() - self.height()) // 2
-
-        self.move(start_x, start_y)
-        self.show()
-
-        self.anim = QPropertyAnimation(self, b"pos", self)
-        self.anim.setDuration(700)
-        self.anim.setStartValue(QPoint(start_x, start_y))
-        self.anim.setEndValue(QPoint(start_x, end_y))
-        self.anim.start()
-
-        QTimer.singleShot(2000, self.hide_message)
-
-    def hide_message(self):
-        start_pos = self.pos()
-        end_pos = QPoint(start_pos.x(), 0)
-
-        self.anim = QPropertyAnimation(self, b"pos", self)
-        self.anim.setDuration(500)
-        self.anim.setStartValue(start_pos)
-        self.anim.setEndValue(end_pos)
-        self.anim.finished.connect(self.hide)
-        self.anim.start()
+from PyQt5.QtGui import QIcon, QCursor
+from PyQt5.QtCore import Qt, QSize, QEvent, pyqtSignal
+from floating_message import FloatingMessage
+from history import CalculationHistory
+from image_service import shared_image_service
+import qt_asyncio
+from signal_dispatcher import shared_dispatcher
+from timer_service import shared_timer_service, format_elapsed
+from window_cache import WindowCache
 
 
 class MenuWindow(QWidget):
-    def __init__(self):
+    expression_selected = pyqtSignal(str)
+
+    def __init__(self, history=None):
         super().__init__()
         self.setWindowTitle("منوی تنظیمات")
-        self.setFixedSize(300, 200)
+        self.setFixedSize(300, 450)
+        self.history = history
 
         self.background_label = QLabel(self)
-        bg_pixmap = QPixmap("pic/v.webp").scaled(self.size())
-        self.background_label.setPixmap(bg_pixmap)
-        self.background_label.setGeometry(0, 0, 300, 200)
+        self.background_label.setGeometry(0, 0, 300, 450)
+        shared_image_service().load_into(self.background_label, "pic/v.webp", 300, 450)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(10, 10, 10, 10)
@@ -94,12 +42,38 @@ class MenuWindow(QWidget):
             )
             layout.addWidget(btn)
 
+        # تاریخچه محاسبات
+        self.history_search = QLineEdit()
+        self.history_search.setPlaceholderText("جستجو در تاریخچه")
+        self.history_search.textChanged.connect(self.refresh_history)
+        layout.addWidget(self.history_search)
+
+        self.history_list = QListWidget()
+        self.history_list.itemClicked.connect(
+            lambda item: self.expression_selected.emit(item.data(Qt.UserRole))
+        )
+        layout.addWidget(self.history_list)
+
         btn1.clicked.connect(lambda: self.button_clicked("گزینه اول"))
         btn2.clicked.connect(lambda: self.button_clicked("گزینه دوم"))
         btn3.clicked.connect(lambda: self.button_clicked("گزینه سوم"))
 
         self.setLayout(layout)
 
+    def showEvent(self, event):
+        # پنجره دوباره استفاده می‌شود، پس تاریخچه را هر بار که نمایش داده می‌شود تازه می‌کنیم
+        self.refresh_history()
+        super().showEvent(event)
+
+    def refresh_history(self):
+        self.history_list.clear()
+        if self.history is None:
+            return
+        for expression, result in self.history.search(self.history_search.text()):
+            item = QListWidgetItem(f"{expression} = {result}")
+            item.setData(Qt.UserRole, expression)
+            self.history_list.addItem(item)
+
     def button_clicked(self, text):
         print(f"{text} انتخاب شد")
 
@@ -115,9 +89,8 @@ class Calculator(QWidget):
         self.setFixedSize(620, 800)
 
         self.background_label = QLabel(self)
-        bg_pixmap = QPixmap("pic/OIP.webp").scaled(self.size())
-        self.background_label.setPixmap(bg_pixmap)
         self.background_label.setGeometry(0, 0, 620, 800)
+        shared_image_service().load_into(self.background_label, "pic/OIP.webp", 620, 800)
 
         self.timer_label = QLabel("00:00", self)
         self.timer_label.setGeometry(10, 10, 600, 40)
@@ -131,9 +104,8 @@ class Calculator(QWidget):
             "font-size: 18pt; border: 2px solid gray; border-radius: 5px; background: white;"
         )
 
-        self.icon_normal = QIcon("pic/download-removebg-preview.png")
-        self.icon_hover = QIcon("pic/v-removebg-preview.png")
-        self.icon_pressed = QIcon("pic/p-removebg-preview.png")
+        # تا بارگذاری در پس‌زمینه تمام شود، آیکون خالی است
+        self.icon_normal = self.icon_hover = self.icon_pressed = QIcon()
 
         self.buttons = {}
         button_definitions = [
@@ -154,7 +126,7 @@ class Calculator(QWidget):
             btn.installEventFilter(self)
 
             if text == '=':
-                btn.clicked.connect(self.start_calculate_thread)
+                btn.clicked.connect(self.start_calculate_task)
             elif text == 'C':
                 btn.clicked.connect(self.clear)
             elif text == 'e':
@@ -162,7 +134,7 @@ class Calculator(QWidget):
             elif text == 'M':
                 btn.clicked.connect(self.open_menu_window)
             elif text == 'r':
-                btn.clicked.connect(self.start_insert_random_thread)
+                btn.clicked.connect(self.start_insert_random_task)
             else:
                 btn.clicked.connect(lambda checked, t=text: self.press(t))
 
@@ -170,18 +142,35 @@ class Calculator(QWidget):
 
         self.floating_msg = FloatingMessage(self)
 
+        self.windows = WindowCache()
+
+        qt_asyncio.create_task(self.load_icons())
+
+        # نویسنده تاریخچه در thread جداست؛ خبر نوشتن از طریق dispatcher به رابط کاربری می‌رسد
+        self.dispatcher = shared_dispatcher()
+        self.history = CalculationHistory(
+            on_written=lambda: self.dispatcher.post('history', self.refresh_menu_history)
+        )
+
         self.calculation_done.connect(self.on_calculation_done)
         self.random_number_added.connect(self.on_random_number_added)
 
-        # استفاده از QThread برای تایمر
-        self.timer_thread = QTimerThread()
-        self.timer_thread.update_time.connect(self.update_timer_label)
-        self.timer_thread.start()
+        # تایمر از سرویس مشترک (بدون thread جدا)
+        self.timer_service = shared_timer_service()
+        self.timer_subscription = self.timer_service.subscribe(self.update_timer_label)
 
-    def start_insert_random_thread(self):
-        QTimer.singleShot(10, self.insert_random_number)
+    async def load_icons(self):
+        self.icon_normal, self.icon_hover, self.icon_pressed = await shared_image_service().load_icons(
+            ["pic/download-removebg-preview.png", "pic/v-removebg-preview.png", "pic/p-removebg-preview.png"],
+            60, self.devicePixelRatioF()
+        )
+        for btn in self.buttons:
+            btn.setIcon(self.icon_normal)
 
-    def insert_random_number(self):
+    def start_insert_random_task(self):
+        qt_asyncio.create_task(self.insert_random_number())
+
+    async def insert_random_number(self):
         num = random.randint(0, 10)
         self.random_number_added.emit(num)
 
@@ -189,15 +178,22 @@ class Calculator(QWidget):
         self.entry.setText(self.entry.text() + str(num))
         self.floating_msg.show_message(f"عدد تصادفی {num} اضافه شد")
 
-    def start_calculate_thread(self):
-        QTimer.singleShot(10, self.calculate)
-
-    def calculate(self):
-        try:
-            result = eval(self.entry.text())
-            self.calculation_done.emit(str(result))
-        except Exception:
-            self.calculation_done.emit("خطا")
+    def start_calculate_task(self):
+        qt_asyncio.create_task(self.calculate())
+
+    async def calculate(self):
+        expression = self.entry.text()
+        # اگر این عبارت قبلا حساب شده، نتیجه را از تاریخچه برمی‌داریم
+        result = self.history.lookup(expression)
+        if result is None:
+            try:
+                # eval در thread pool اجرا می‌شود تا رابط کاربری قفل نشود
+                result = str(await qt_asyncio.run_in_executor(eval, expression))
+            except Exception:
+                self.calculation_done.emit("خطا")
+                return
+            self.history.add(expression, result)
+        self.calculation_done.emit(result)
 
     def on_calculation_done(self, result):
         self.entry.setText(result)
@@ -206,31 +202,40 @@ class Calculator(QWidget):
         else:
             self.floating_msg.show_message("محاسبه انجام شد")
 
-    def update_timer_label(self, text):
-        self.timer_label.setText(text)
+    def update_timer_label(self, elapsed):
+        self.timer_label.setText(format_elapsed(elapsed))
 
     def press(self, key):
         current_text = self.entry.text()
         self.entry.setText(current_text + key)
-        self.floating_msg.show_message(f"دکمه {key} فشار داده شد")
+        self.floating_msg.show_message(
+            f"دکمه {key} فشار داده شد", group='key', summary="{count} دکمه فشار داده شد"
+        )
 
     def clear(self):
         self.entry.clear()
         self.floating_msg.show_message("صفحه پاک شد")
-        self.timer_thread.seconds = 0
+        self.timer_service.reset(self.timer_subscription)
         self.timer_label.setText("00:00")
 
     def exit(self):
-        if hasattr(self, 'menu_window'):
-            self.menu_window.close()
-        self.timer_thread.stop()
-        self.timer_thread.quit()
-        self.timer_thread.wait()
+        self.windows.close_all()
+        print(f"پنجره‌های ساخته شده: {self.windows.report()}")
+        self.history.close()
+        self.timer_service.unsubscribe(self.timer_subscription)
         self.close()
 
+    def refresh_menu_history(self):
+        if hasattr(self, 'menu_window') and self.menu_window.isVisible():
+            self.menu_window.refresh_history()
+
     def open_menu_window(self):
-        self.menu_window = MenuWindow()
-        self.menu_window.show()
+        self.menu_window = self.windows.show('menu', self.create_menu_window)
+
+    def create_menu_window(self):
+        menu_window = MenuWindow(self.history)
+        menu_window.expression_selected.connect(self.entry.setText)
+        return menu_window
 
     def eventFilter(self, source, event):
         if source in self.buttons:
@@ -0,0 +1,59 @@
+import os
+import mmap
+
+
+class MappedText:
+    # فایل با mmap باز می‌شود و فقط تکه‌های لازم خوانده می‌شوند؛
+    # مرز تکه‌ها اگر خط کوتاه‌تر از یک تکه باشد روی ابتدای خط قرار می‌گیرد تا خطی نصفه نماند،
+    # وگرنه (خط خیلی بلند) همان جا روی مرز یک کاراکتر UTF-8 بریده می‌شود
+    CHUNK_SIZE = 256 * 1024
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._file = open(path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        # فایل خالی را نمی‌شود mmap کرد
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+
+    def chunk_count(self):
+        return max(1, -(-self.size // self.chunk_size))
+
+    def _boundary(self, position):
+        if position <= 0:
+            return 0
+        if position >= self.size:
+            return self.size
+        newline = self._map.find(b'\n', position - 1, position - 1 + self.chunk_size)
+        if newline != -1:
+            return newline + 1
+        # بایت‌های ادامه کاراکتر (10xxxxxx) نباید از ابتدای کاراکترشان جدا شوند
+        cut = position
+        while cut > position - 3 and self._map[cut] & 0xC0 == 0x80:
+            cut -= 1
+        return cut
+
+    def chunk_bounds(self, index):
+        start = self._boundary(index * self.chunk_size)
+        return start, max(start, self._boundary((index + 1) * self.chunk_size))
+
+    def next_chunk(self, index, step=1):
+        # نزدیک‌ترین تکه غیر خالی بعدی (step=1) یا قبلی (step=-1)
+        index += step
+        while 0 <= index < self.chunk_count():
+            start, end = self.chunk_bounds(index)
+            if end > start:
+                return index
+            index += step
+        return None
+
+    def read(self, start, end):
+        if self._map is None:
+            return ""
+        return self._map[start:end].decode('utf-8', errors='replace')
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
@@ -0,0 +1,111 @@
+import heapq
+import asyncio
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+
+class QtEventLoop(asyncio.SelectorEventLoop):
+    # همان حلقه selector روی همه سیستم‌ها (در ویندوز هم، نه Proactor)؛ فقط متدهای عمومی
+    # زمان‌بندی را دنبال می‌کند تا bridge بداند دور بعد کی لازم است.
+    # ورودی/خروجی سوکت روی این حلقه پشتیبانی نمی‌شود، فقط coroutine و تایمر و executor
+    def __init__(self):
+        super().__init__()
+        self.bridge = None
+        self.timers = []
+        self.ready = False
+        self._order = 0
+
+    def call_soon(self, callback, *args, context=None):
+        handle = super().call_soon(callback, *args, context=context)
+        self.ready = True
+        if self.bridge is not None and not self.is_running():
+            self.bridge.wake()
+        return handle
+
+    def call_at(self, when, callback, *args, context=None):
+        handle = super().call_at(when, callback, *args, context=context)
+        self._order += 1
+        heapq.heappush(self.timers, (when, self._order, handle))
+        if self.bridge is not None and not self.is_running():
+            self.bridge.wake()
+        return handle
+
+    def call_soon_threadsafe(self, callback, *args, context=None):
+        handle = super().call_soon_threadsafe(callback, *args, context=context)
+        if self.bridge is not None:
+            # سیگنال از thread دیگر به صورت صف‌شده در thread رابط کاربری اجرا می‌شود
+            self.bridge.woken.emit()
+        return handle
+
+
+class AsyncioBridge(QObject):
+    # حلقه asyncio داخل حلقه رویداد Qt اجرا می‌شود: هر بار فقط یک دور از حلقه asyncio
+    # را اجرا می‌کنیم و دور بعد را برای نزدیک‌ترین تایمر تنظیم می‌کنیم؛ وقتی کاری نیست بیدار نمی‌شود
+    NESTED_RETRY_MS = 50
+
+    woken = pyqtSignal()
+
+    def __init__(self, loop, parent=None):
+        super().__init__(parent)
+        self.loop = loop
+        loop.bridge = self
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._run_once)
+        self.woken.connect(self.wake)
+
+        self.wake()
+
+    def wake(self):
+        self._timer.start(0)
+
+    def _run_once(self):
+        if self.loop.is_closed():
+            return
+        if self.loop.is_running():
+            # حلقه تو در تو (مثلا QMessageBox.exec داخل یک coroutine)؛ فقط تا تمام شدنش دوباره امتحان می‌شود
+            self._timer.start(self.NESTED_RETRY_MS)
+            return
+        started = self.loop.time()
+        self.loop.call_soon(self.loop.stop)
+        self.loop.ready = False
+        self.loop.run_forever()
+        delay = self._next_delay(started)
+        if delay is None:
+            self._timer.stop()
+        else:
+            self._timer.start(delay)
+
+    def _next_delay(self, started):
+        if self.loop.ready:
+            return 0
+        # تایمرهایی که تا شروع این دور موعدشان رسیده بود حتما اجرا شده‌اند
+        timers = self.loop.timers
+        while timers and (timers[0][0] <= started or timers[0][2].cancelled()):
+            heapq.heappop(timers)
+        if not timers:
+            return None
+        return max(0, int((timers[0][0] - self.loop.time()) * 1000 + 0.999))
+
+
+_loop = None
+_bridge = None
+
+
+def event_loop():
+    global _loop, _bridge
+    if _loop is None:
+        _loop = QtEventLoop()
+        asyncio.set_event_loop(_loop)
+        _bridge = AsyncioBridge(_loop)
+    return _loop
+
+
+def create_task(coro):
+    return event_loop().create_task(coro)
+
+
+def run_in_executor(func, *args):
+    # فقط کارهای سنگین پردازشی به thread pool می‌روند
+    return event_loop().run_in_executor(None, func, *args)
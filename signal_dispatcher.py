@@ -0,0 +1,54 @@
+import threading
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+
+class SignalDispatcher(QObject):
+    # به‌روزرسانی‌هایی که از threadهای دیگر می‌آیند جمع می‌شوند و در هر فریم
+    # فقط یک بار در thread رابط کاربری اجرا می‌شوند؛ برای هر کلید فقط آخرین مقدار می‌ماند
+    FRAME_MS = 16
+
+    _wake = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self.drain_count = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.FRAME_MS)
+        self._timer.timeout.connect(self._drain)
+        self._wake.connect(self._start_frame)
+
+    def post(self, key, callback, *args):
+        with self._lock:
+            self._pending[key] = (callback, args)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        # فقط اولین به‌روزرسانی هر فریم یک رویداد به thread رابط کاربری می‌فرستد
+        self._wake.emit()
+
+    @pyqtSlot()
+    def _start_frame(self):
+        self._timer.start()
+
+    def _drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+        for callback, args in pending.values():
+            callback(*args)
+        self.drain_count += 1
+
+
+_shared_dispatcher = None
+
+
+def shared_dispatcher():
+    global _shared_dispatcher
+    if _shared_dispatcher is None:
+        _shared_dispatcher = SignalDispatcher()
+    return _shared_dispatcher
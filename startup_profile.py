@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import time
+import statistics
+import subprocess
+
+# برنامه‌ها و کلاس پنجره اصلی هر کدام
+ENTRY_POINTS = {
+    'vala': 'Calculator',
+    'new': 'Calculator',
+    'window': 'MainWindow',
+    'windowpart2': 'MainWindow',
+    'windowpart4': 'MainWindow',
+}
+
+
+def measure_child(module_name):
+    # در یک پروسه تازه اجرا می‌شود: زمان import، ساخت پنجره و اولین paint
+    start = time.perf_counter()
+    module = __import__(module_name)
+    imported = time.perf_counter()
+
+    qt = 'PyQt6' if 'PyQt6.QtWidgets' in sys.modules else 'PyQt5'
+    QtWidgets = __import__(f'{qt}.QtWidgets', fromlist=['QApplication'])
+    QtCore = __import__(f'{qt}.QtCore', fromlist=['QObject'])
+    paint_event = QtCore.QEvent.Type.Paint if qt == 'PyQt6' else QtCore.QEvent.Paint
+
+    app = QtWidgets.QApplication(sys.argv[:1])
+    timings = {'import': imported - start}
+
+    class PaintWatcher(QtCore.QObject):
+        def eventFilter(self, source, event):
+            if event.type() == paint_event and 'first_paint' not in timings:
+                timings['first_paint'] = time.perf_counter() - start
+                QtCore.QTimer.singleShot(0, app.quit)
+            return False
+
+    watcher = PaintWatcher()
+    window = getattr(module, ENTRY_POINTS[module_name])()
+    timings['window'] = time.perf_counter() - imported
+    window.installEventFilter(watcher)
+    window.show()
+    QtCore.QTimer.singleShot(5000, app.quit)
+    app.exec()
+
+    timings['heavy_modules'] = sorted(
+        name for name in ('numpy', 'reportlab', 'sqlite3', 'asyncio') if name in sys.modules
+    )
+    print(json.dumps(timings))
+    sys.stdout.flush()
+    # خروج بدون پاک‌سازی Qt تا threadهای پس‌زمینه زمان را خراب نکنند
+    os._exit(0)
+
+
+def measure(module_name, runs=5):
+    results = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', module_name],
+            capture_output=True, text=True
+        ).stdout
+        wall = time.perf_counter() - start
+        lines = [line for line in output.splitlines() if line.startswith('{')]
+        if not lines:
+            return None
+        timings = json.loads(lines[-1])
+        timings['wall'] = wall
+        results.append(timings)
+
+    summary = {
+        key: statistics.median(r[key] for r in results if key in r)
+        for key in ('import', 'window', 'first_paint', 'wall')
+    }
+    summary['heavy_modules'] = results[-1]['heavy_modules']
+    return summary
+
+
+def main(argv):
+    if len(argv) > 1 and argv[0] == '--child':
+        measure_child(argv[1])
+        return
+
+    names = argv or list(ENTRY_POINTS)
+    print(f"{'entry':<12} {'import':>9} {'window':>9} {'paint':>9} {'wall':>9}  heavy modules")
+    for name in names:
+        summary = measure(name)
+        if summary is None:
+            print(f"{name:<12} failed to start")
+            continue
+        print(
+            f"{name:<12} {summary['import'] * 1000:8.1f}ms {summary['window'] * 1000:8.1f}ms "
+            f"{summary['first_paint'] * 1000:8.1f}ms {summary['wall'] * 1000:8.1f}ms  "
+            f"{', '.join(summary['heavy_modules'])}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,26 +1,19 @@
-import threading
-import time
+import asyncio
 
-def print_numbers():
+async def print_numbers():
     for i in range(5):
         print(f"Number: {i}")
-        time.sleep(1)
+        await asyncio.sleep(1)
 
-def print_letters():
+async def print_letters():
     for letter in 'ABCDE':
         print(f"Letter: {letter}")
-        time.sleep(1)
+        await asyncio.sleep(1)
 
-# ایجاد نخ‌ها
-thread1 = threading.Thread(target=print_numbers)
-thread2 = threading.Thread(target=print_letters)
+async def main():
+    # اجرای هم‌زمان دو coroutine روی یک حلقه، بدون ساختن نخ
+    await asyncio.gather(print_numbers(), print_letters())
 
-# شروع نخ‌ها
-thread1.start()
-thread2.start()
+asyncio.run(main())
 
-# انتظار برای پایان نخ‌ها
-thread1.join()
-thread2.join()
-
-print("All threads are done!")
+print("All tasks are done!")
@@ -0,0 +1,141 @@
+import re
+from collections import defaultdict
+from PyQt6 import sip
+from PyQt6.QtGui import QTextBlockUserData
+
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return set(WORD.findall(text.lower()))
+
+
+def utf16_len(text):
+    # مکان‌ها در Qt به واحد UTF-16 هستند؛ کاراکترهای بیرون از BMP (مثل ایموجی) دو واحدند
+    return len(text.encode('utf-16-le')) // 2
+
+
+class BlockId(QTextBlockUserData):
+    # Qt این شیء را همراه بلوک حذف می‌کند؛ با sip.isdeleted می‌فهمیم بلوک دیگر وجود ندارد
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+
+class TextIndex:
+    # ایندکس معکوس روی بلوک‌های (خط‌های) QTextDocument؛
+    # هر بلوک یک شناسه در userData دارد و با هر تغییر فقط بلوک‌های تغییر کرده دوباره ایندکس می‌شوند
+    def __init__(self):
+        self.postings = defaultdict(set)
+        self.block_tokens = {}
+        self.blocks = {}
+        self.page_blocks = defaultdict(set)
+        self.connections = {}
+        # صفحه‌هایی که کل متنشان عوض شده و تا جستجوی بعدی ایندکس نمی‌شوند
+        self.stale = set()
+        self._next_id = 0
+
+    def add_document(self, page, document):
+        def on_change(position, removed, added):
+            self.update(page, document, position, removed, added)
+
+        document.contentsChange.connect(on_change)
+        self.connections[page] = (document, on_change)
+        self.stale.add(page)
+
+    def remove_document(self, page):
+        if page in self.connections:
+            document, on_change = self.connections.pop(page)
+            try:
+                document.contentsChange.disconnect(on_change)
+            except (TypeError, RuntimeError):
+                pass
+        self.stale.discard(page)
+        for block_id in self.page_blocks.pop(page, ()):
+            self._forget(block_id)
+
+    def update(self, page, document, position, removed, added):
+        if page in self.stale:
+            return
+        if position == 0 and added >= document.characterCount() - 1:
+            # کل متن عوض شده (مثلا setPlainText یا جابجا شدن تکه‌های فایل)؛
+            # ایندکس قبلی به کار نمی‌آید و ایندکس تازه تا جستجوی بعدی صبر می‌کند
+            for block_id in self.page_blocks.pop(page, ()):
+                self._forget(block_id)
+            self.stale.add(page)
+            return
+        first = document.findBlock(position)
+        last = document.findBlock(position + added)
+        if not last.isValid():
+            last = document.lastBlock()
+        self._index_range(page, first, last)
+
+    def _index_range(self, page, block, last):
+        end = last.position()
+        while block.isValid() and block.position() <= end:
+            self._index_block(page, block)
+            block = block.next()
+
+    def _index_block(self, page, block):
+        old = block.userData()
+        if isinstance(old, BlockId):
+            self._forget(old.value)
+            self.page_blocks[page].discard(old.value)
+
+        block_id = self._next_id
+        self._next_id += 1
+        data = BlockId(block_id)
+        # setUserData شیء قبلی را خود Qt حذف می‌کند
+        block.setUserData(data)
+
+        tokens = tokenize(block.text())
+        self.block_tokens[block_id] = tokens
+        self.blocks[block_id] = (page, block, data)
+        self.page_blocks[page].add(block_id)
+        for token in tokens:
+            self.postings[token].add(block_id)
+
+    def _forget(self, block_id):
+        for token in self.block_tokens.pop(block_id, ()):
+            ids = self.postings.get(token)
+            if ids is not None:
+                ids.discard(block_id)
+                if not ids:
+                    del self.postings[token]
+        self.blocks.pop(block_id, None)
+
+    def search(self, query, limit=200):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        while self.stale:
+            page = self.stale.pop()
+            document = self.connections[page][0]
+            self._index_range(page, document.begin(), document.lastBlock())
+        candidates = None
+        for token in sorted(tokens, key=lambda t: len(self.postings.get(t, ()))):
+            ids = self.postings.get(token)
+            if not ids:
+                return []
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return []
+
+        hits = []
+        needle = query.strip().lower()
+        first_token = min(tokens)
+        for block_id in sorted(candidates):
+            page, block, data = self.blocks[block_id]
+            if sip.isdeleted(data):
+                # بلوک حذف شده (مثلا با ادغام دو خط)؛ همین‌جا از ایندکس پاک می‌شود
+                self._forget(block_id)
+                self.page_blocks[page].discard(block_id)
+                continue
+            text = block.text()
+            offset = text.lower().find(needle)
+            if offset == -1:
+                offset = max(0, text.lower().find(first_token))
+            hits.append((page, block.position() + utf16_len(text[:offset]), text))
+            if len(hits) >= limit:
+                break
+        return hits
@@ -0,0 +1,77 @@
+import math
+import time
+from PyQt5.QtCore import QObject, QTimer, Qt
+
+
+def format_elapsed(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 60:02}:{seconds % 60:02}"
+
+
+class TimerSubscription:
+    def __init__(self, callback, interval):
+        self.callback = callback
+        self.interval = interval
+        self.start = time.monotonic()
+        self.next_due = self.start + interval
+
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+
+class TimerService(QObject):
+    # یک QTimer برای همه تایمرها؛ زمان گذشته همیشه از لحظه شروع و با ساعت monotonic
+    # حساب می‌شود، پس خطا روی هم جمع نمی‌شود
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.subscriptions = []
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+
+    def subscribe(self, callback, interval=1.0):
+        subscription = TimerSubscription(callback, interval)
+        self.subscriptions.append(subscription)
+        self._schedule()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+        self._schedule()
+
+    def reset(self, subscription):
+        subscription.start = time.monotonic()
+        subscription.next_due = subscription.start + subscription.interval
+        self._schedule()
+
+    def _schedule(self):
+        if not self.subscriptions:
+            self._timer.stop()
+            return
+        next_due = min(s.next_due for s in self.subscriptions)
+        delay = max(0, math.ceil((next_due - time.monotonic()) * 1000))
+        self._timer.start(delay)
+
+    def _tick(self):
+        now = time.monotonic()
+        for subscription in list(self.subscriptions):
+            if now < subscription.next_due:
+                continue
+            elapsed = now - subscription.start
+            # اگر چند دوره جا افتاده باشد، مستقیم به دوره بعدی می‌پریم
+            ticks = math.floor(elapsed / subscription.interval)
+            subscription.next_due = subscription.start + (ticks + 1) * subscription.interval
+            subscription.callback(elapsed)
+        self._schedule()
+
+
+_shared_service = None
+
+
+def shared_timer_service():
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = TimerService()
+    return _shared_service
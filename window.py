@@ -1,10 +1,31 @@
 import sys
-import math
+from contextlib import contextmanager
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLineEdit, QPushButton, QLabel, QMessageBox, QHBoxLayout, QSpacerItem, QSizePolicy
 )
-from PyQt6.QtCore import QRect, Qt
+from PyQt6.QtCore import QRect, Qt, QTimer
 from PyQt6.QtGui import QIntValidator
+from layout_solver import solve_screens
+
+MIN_WINDOW_SIZE = 100
+WINDOW_ASPECT = 16 / 10
+# جای پنجره کنترل در پایین صفحه اصلی
+CONTROLLER_RESERVE = 100
+
+
+def screen_areas():
+    # فضای قابل استفاده همه صفحه‌نمایش‌ها به شکل (x, y, w, h)
+    primary = QApplication.primaryScreen()
+    areas = []
+    for screen in QApplication.screens():
+        geom = screen.availableGeometry()
+        height = geom.height() - (CONTROLLER_RESERVE if screen == primary else 0)
+        areas.append((geom.x(), geom.y(), geom.width(), height))
+    return tuple(areas)
+
+
+def solve_windows(n):
+    return solve_screens(n, screen_areas(), WINDOW_ASPECT, MIN_WINDOW_SIZE)
 
 class ControlledWindow(QWidget):
     def __init__(self, index, controller):
@@ -30,6 +51,13 @@ class ControllerWindow(QWidget):
         self.setWindowTitle("کنترل پنجره‌ها")
         self.windows = windows  # لیست پنجره‌ها (بدون None)
         self.main_window = main_window
+        # آخرین جایی که به هر پنجره داده شده
+        self.applied = {}
+        self.rearrange_pending = False
+        # حالت دسته‌ای: چیدمان تا پایان عملیات عقب می‌افتد
+        self.bulk_depth = 0
+        self.bulk_removed = set()
+        self.bulk_dirty = False
         self.setup_ui()
 
     def setup_ui(self):
@@ -55,68 +83,92 @@ class ControllerWindow(QWidget):
         y = geom.y() + geom.height() - self.height() - 50
         self.move(x + 50, y)
 
+    @contextmanager
+    def bulk_update(self):
+        self.bulk_depth += 1
+        try:
+            yield
+        finally:
+            self.bulk_depth -= 1
+            if self.bulk_depth == 0:
+                self.finish_bulk_update()
+
+    def finish_bulk_update(self):
+        if self.bulk_removed:
+            # یک بار فیلتر به جای remove برای هر پنجره (که O(N^2) می‌شد)
+            self.windows[:] = [w for w in self.windows if w not in self.bulk_removed]
+            for w in self.bulk_removed:
+                self.applied.pop(w, None)
+            self.bulk_removed.clear()
+        if self.bulk_dirty:
+            self.bulk_dirty = False
+            if self.windows:
+                self.schedule_rearrange()
+            else:
+                self.close()
+                self.main_window.close()
+
     def close_all(self):
-        for w in self.windows:
-            w.close()
-        self.windows.clear()
+        with self.bulk_update():
+            for w in list(self.windows):
+                w.close()
         self.close()
         self.main_window.close()
 
     def add_window(self):
-        if len(self.windows) >= 16:
-            QMessageBox.warning(self, "هشدار", "به نهایت تعداد پنجره (16) رسیدید.")
+        if solve_windows(len(self.windows) + 1) is None:
+            QMessageBox.warning(self, "هشدار", "جای خالی برای پنجره جدید روی صفحه‌نمایش‌ها نیست.")
             return
 
         new_index = len(self.windows)
         new_window = ControlledWindow(new_index, self)
         self.windows.append(new_window)
-        self.rearrange_windows()
+        self.schedule_rearrange()
 
     def rearrange_windows(self):
         n = len(self.windows)
         if n == 0:
             return
 
-        screen = QApplication.primaryScreen()
-        screen_geom = screen.availableGeometry()
-        screen_width = screen_geom.width()
-        screen_height = screen_geom.height()
-
-        max_usage_ratio = 0.8
-
-        cols = math.ceil(math.sqrt(n))
-        rows = math.ceil(n / cols)
-
-        max_width_per_window = int((screen_width * max_usage_ratio) // cols)
-        max_height_per_window = int((screen_height * max_usage_ratio) // rows)
-
-        total_width = max_width_per_window * cols
-        total_height = max_height_per_window * rows
-
-        offset_x = int((screen_width - total_width) // 2 + screen_geom.x())
-        offset_y = int((screen_height - total_height) // 2 + screen_geom.y())
-
-        if max_width_per_window < 100 or max_height_per_window < 100:
+        # پنجره‌ها بین همه صفحه‌نمایش‌ها پخش می‌شوند
+        rects = solve_windows(n)
+        if rects is None:
             QMessageBox.warning(self, "خطا", "پنجره‌ها خیلی کوچک شده‌اند. عدد کمتری وارد کنید یا بعضی پنجره‌ها را ببندید.")
             return
 
-        for i, w in enumerate(self.windows):
-            w.setWindowTitle(f"پنجره {i + 1}")
-            row = i // cols
-            col = i % cols
-            w.setGeometry(QRect(
-                offset_x + col * max_width_per_window,
-                offset_y + row * max_height_per_window,
-                max_width_per_window,
-                max_height_per_window
-            ))
-            w.show()
+        # فقط پنجره‌هایی که جا یا عنوانشان عوض شده به‌روز می‌شوند؛
+        # هر setGeometry/setWindowTitle یک رفت و برگشت با window manager است
+        for i, (w, rect) in enumerate(zip(self.windows, rects)):
+            title = f"پنجره {i + 1}"
+            if w.windowTitle() != title:
+                w.setWindowTitle(title)
+            if self.applied.get(w) != rect:
+                w.setGeometry(QRect(*rect))
+                self.applied[w] = rect
+            if not w.isVisible():
+                w.show()
+
+    def schedule_rearrange(self):
+        # چند تغییر پشت سر هم (مثلا چند کلیک سریع) فقط یک چیدمان انجام می‌دهند
+        if not self.rearrange_pending:
+            self.rearrange_pending = True
+            QTimer.singleShot(0, self.run_scheduled_rearrange)
+
+    def run_scheduled_rearrange(self):
+        self.rearrange_pending = False
+        self.rearrange_windows()
 
     def window_closed(self, window):
+        if self.bulk_depth:
+            self.bulk_removed.add(window)
+            self.bulk_dirty = True
+            return
+
         # حذف پنجره از لیست و چیدمان مجدد
         if window in self.windows:
             self.windows.remove(window)
-            self.rearrange_windows()
+            self.applied.pop(window, None)
+            self.schedule_rearrange()
             if len(self.windows) == 0:
                 # اگر همه پنجره‌ها بسته شدند، کنترلر و پنجره اصلی را هم ببندیم
                 self.close()
@@ -128,7 +180,7 @@ class MainWindow(QWidget):
 
         self.layout = QVBoxLayout()
 
-        self.label = QLabel("تعداد پنجره‌ها را وارد کنید (1 تا 16):")
+        self.label = QLabel("تعداد پنجره‌ها را وارد کنید:")
         self.layout.addWidget(self.label)
 
         self.input = QLineEdit()
@@ -149,8 +201,8 @@ class MainWindow(QWidget):
         if not text:
             return
         n = int(text)
-        if n > 16:
-            QMessageBox.warning(self, "خطا", "تعداد پنجره‌ها نمی‌تواند بیشتر از 16 باشد.")
+        if solve_windows(n) is None:
+            QMessageBox.warning(self, "خطا", "این تعداد پنجره روی صفحه‌نمایش‌ها جا نمی‌شود.")
             return
         if n <= 0:
             return
@@ -0,0 +1,32 @@
+from collections import Counter
+from PyQt5 import sip
+
+
+class WindowCache:
+    # پنجره‌های فرعی یک بار ساخته می‌شوند و بعد از بستن فقط مخفی می‌مانند
+    def __init__(self):
+        self._windows = {}
+        self.construction_counts = Counter()
+
+    def get(self, key, factory):
+        window = self._windows.get(key)
+        if window is None or sip.isdeleted(window):
+            window = factory()
+            self._windows[key] = window
+            self.construction_counts[key] += 1
+        return window
+
+    def show(self, key, factory):
+        window = self.get(key, factory)
+        window.show()
+        window.raise_()
+        window.activateWindow()
+        return window
+
+    def close_all(self):
+        for window in self._windows.values():
+            if not sip.isdeleted(window):
+                window.close()
+
+    def report(self):
+        return ", ".join(f"{key}: {count}" for key, count in self.construction_counts.items())
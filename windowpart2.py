@@ -1,19 +1,28 @@
 import sys
-import math
+import itertools
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLineEdit, QPushButton,
     QLabel, QMessageBox, QGridLayout, QTextEdit, QGroupBox,
-    QSizePolicy, QScrollArea, QHBoxLayout
+    QSizePolicy, QScrollArea, QHBoxLayout, QFileDialog, QListWidget, QListWidgetItem
 )
-from PyQt6.QtGui import QIntValidator, QMouseEvent
+from PyQt6.QtGui import QIntValidator, QMouseEvent, QTextCursor, QTextOption
 from PyQt6.QtCore import Qt, pyqtSignal
+from layout_solver import grid_positions
+from paged_text import MappedText
+from text_index import TextIndex, utf16_len
+from autosave import AutosaveManager
+from file_ingest import iter_files
 
 class PageWidget(QGroupBox):
     double_clicked = pyqtSignal(object)
+    file_opened = pyqtSignal(object)
+    LONG_LINE = 10000
 
-    def __init__(self, index, close_callback):
+    def __init__(self, index, close_callback, page_id=None):
         super().__init__(f"صفحه {index + 1}")
         self.close_callback = close_callback
+        # شناسه ثابت صفحه برای ذخیره خودکار (با جابجا شدن صفحه‌ها عوض نمی‌شود)
+        self.page_id = page_id
         self.is_maximized = False
 
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
@@ -26,6 +35,11 @@ class PageWidget(QGroupBox):
         self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         header_layout.addWidget(self.label)
 
+        self.btn_open = QPushButton("باز کردن فایل")
+        self.btn_open.setFixedWidth(100)
+        self.btn_open.clicked.connect(self.choose_file)
+        header_layout.addWidget(self.btn_open)
+
         self.btn_close = QPushButton("بستن صفحه")
         self.btn_close.setFixedWidth(100)
         self.btn_close.clicked.connect(self.close_page)
@@ -45,13 +59,82 @@ class PageWidget(QGroupBox):
         text_layout.addWidget(self.text_edit)
         text_group.setLayout(text_layout)
 
+        # فایل باز شده: فقط دو تکه پشت سر هم در ویرایشگر است
+        self.mapped = None
+        self.first_chunk = 0
+        self.second_chunk = None
+        self.text_edit.verticalScrollBar().valueChanged.connect(self.on_scroll)
+
         content_layout.addWidget(text_group)
 
         main_layout.addLayout(content_layout)
 
         self.setLayout(main_layout)
 
+    def choose_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "باز کردن فایل")
+        if path:
+            self.open_file(path)
+
+    def open_file(self, path):
+        self.close_file()
+        try:
+            self.mapped = MappedText(path)
+        except OSError as e:
+            QMessageBox.warning(self, "خطا", f"امکان باز کردن فایل وجود ندارد.\n{e}")
+            return
+        self.file_opened.emit(self)
+        self.text_edit.setReadOnly(True)
+        self.show_chunks(self.mapped.next_chunk(-1) or 0)
+        self.text_edit.moveCursor(QTextCursor.MoveOperation.Start)
+
+    def close_file(self):
+        if self.mapped is not None:
+            self.mapped.close()
+            self.mapped = None
+            self.text_edit.setReadOnly(False)
+            self.text_edit.setWordWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+
+    def show_chunks(self, first):
+        first_text = self.mapped.read(*self.mapped.chunk_bounds(first))
+        second_text = ""
+        self.second_chunk = self.mapped.next_chunk(first)
+        if self.second_chunk is not None:
+            second_text = self.mapped.read(*self.mapped.chunk_bounds(self.second_chunk))
+        self.first_chunk = first
+        self.split = utf16_len(first_text)
+        text = first_text + second_text
+        # شکستن خط در مرز کلمه روی خط‌های خیلی بلند درجه دوم است (ده‌ها ثانیه برای چند صد KB)
+        if max(map(len, text.split('\n'))) > self.LONG_LINE:
+            self.text_edit.setWordWrapMode(QTextOption.WrapMode.WrapAnywhere)
+        else:
+            self.text_edit.setWordWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+        self.text_edit.setPlainText(text)
+
+    def on_scroll(self, value):
+        if self.mapped is None:
+            return
+        bar = self.text_edit.verticalScrollBar()
+        # تکه‌های خالی رد می‌شوند تا ویرایشگر هیچ وقت خالی نشود
+        if value >= bar.maximum() and self.second_chunk is not None \
+                and self.mapped.next_chunk(self.second_chunk) is not None:
+            first = self.second_chunk
+        elif value <= bar.minimum() and self.mapped.next_chunk(self.first_chunk, -1) is not None:
+            first = self.mapped.next_chunk(self.first_chunk, -1)
+        else:
+            return
+
+        # در هر دو جهت، متنی که روی صفحه بود از مرز دو تکه جدید شروع می‌شود
+        bar.blockSignals(True)
+        self.show_chunks(first)
+        cursor = self.text_edit.textCursor()
+        cursor.setPosition(min(self.split, self.text_edit.document().characterCount() - 1))
+        self.text_edit.setTextCursor(cursor)
+        self.text_edit.ensureCursorVisible()
+        bar.blockSignals(False)
+
     def close_page(self):
+        self.close_file()
         self.close_callback(self)
 
     def update_index(self, new_index):
@@ -89,6 +172,14 @@ class MainWindow(QWidget):
         self.btn_create.clicked.connect(self.create_pages)
         self.input_layout.addWidget(self.btn_create)
 
+        self.btn_restore = QPushButton("بازیابی صفحات ذخیره شده")
+        self.btn_restore.clicked.connect(self.restore_pages)
+        self.input_layout.addWidget(self.btn_restore)
+
+        self.btn_open_folder = QPushButton("باز کردن پوشه")
+        self.btn_open_folder.clicked.connect(self.open_folder)
+        self.input_layout.addWidget(self.btn_open_folder)
+
         self.btn_exit = QPushButton("خروج")
         self.btn_exit.clicked.connect(self.close)
         self.input_layout.addWidget(self.btn_exit)
@@ -102,9 +193,11 @@ class MainWindow(QWidget):
         self.btn_add_page.clicked.connect(self.add_page)
         self.control_layout.addWidget(self.btn_add_page, alignment=Qt.AlignmentFlag.AlignLeft)
 
-        spacer = QWidget()
-        spacer.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
-        self.control_layout.addWidget(spacer)
+        # جستجو در متن همه صفحات
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("جستجو در همه صفحات")
+        self.search_input.textChanged.connect(self.search_pages)
+        self.control_layout.addWidget(self.search_input)
 
         self.btn_close_all = QPushButton("بستن همه صفحات")
         self.btn_close_all.clicked.connect(self.close_all_pages)
@@ -112,9 +205,21 @@ class MainWindow(QWidget):
 
         self.btn_add_page.hide()
         self.btn_close_all.hide()
+        self.search_input.hide()
 
         main_layout.addLayout(self.control_layout)
 
+        self.search_results = QListWidget()
+        self.search_results.setMaximumHeight(150)
+        self.search_results.itemClicked.connect(self.open_search_result)
+        self.search_results.hide()
+        main_layout.addWidget(self.search_results)
+
+        self.text_index = TextIndex()
+        # متن صفحه‌ها در پس‌زمینه ذخیره می‌شود تا با بستن صفحه از دست نرود
+        self.autosave = AutosaveManager()
+        self.btn_restore.setVisible(bool(self.autosave.saved_page_ids()))
+
         self.scroll_area = QScrollArea()
         self.scroll_area.setWidgetResizable(True)
 
@@ -143,19 +248,77 @@ class MainWindow(QWidget):
         self.clear_grid()
 
         for i in range(n):
-            page = PageWidget(i, self.close_page)
-            page.double_clicked.connect(self.toggle_maximize_page)
-            self.pages.append(page)
+            self.new_page(i)
+
+        self.arrange_pages()
+        self.show_page_controls(True)
+
+    def restore_pages(self):
+        open_ids = {page.page_id for page in self.pages}
+        saved = [page_id for page_id in self.autosave.saved_page_ids() if page_id not in open_ids]
+        # جدیدترین صفحه‌ها، تا جایی که جا هست
+        saved = saved[-(self.MAX_PAGES - len(self.pages)):] if len(self.pages) < self.MAX_PAGES else []
+        if not saved:
+            QMessageBox.warning(self, "هشدار", "صفحه ذخیره شده‌ای برای بازیابی وجود ندارد.")
+            return
+
+        for page_id in saved:
+            try:
+                text = self.autosave.restore(page_id)
+            except (OSError, ValueError) as e:
+                QMessageBox.warning(self, "خطا", f"بازیابی صفحه {page_id} ممکن نیست.\n{e}")
+                continue
+            self.new_page(len(self.pages), page_id, text)
 
         self.arrange_pages()
+        if self.pages:
+            self.show_page_controls(True)
 
-        self.label.hide()
-        self.input.hide()
-        self.btn_create.hide()
-        self.btn_exit.hide()
+    def open_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "باز کردن پوشه")
+        if not folder:
+            return
+        # هر فایل در یک صفحه؛ با mmap فقط دو تکه از هر فایل خوانده می‌شود
+        paths = list(itertools.islice(iter_files(folder), self.MAX_PAGES - len(self.pages)))
+        if not paths:
+            QMessageBox.warning(self, "هشدار", "فایلی در این پوشه پیدا نشد.")
+            return
 
-        self.btn_add_page.show()
-        self.btn_close_all.show()
+        for path in paths:
+            page = self.new_page(len(self.pages), autosave=False)
+            page.open_file(path)
+        self.arrange_pages()
+        self.show_page_controls(True)
+
+    def new_page(self, index, page_id=None, text=None, autosave=True):
+        if page_id is None:
+            page_id = self.autosave.new_page_id()
+        page = PageWidget(index, self.close_page, page_id)
+        if text is not None:
+            page.text_edit.setPlainText(text)
+        page.double_clicked.connect(self.toggle_maximize_page)
+        page.file_opened.connect(self.stop_autosave)
+        self.text_index.add_document(page, page.text_edit.document())
+        if autosave:
+            self.autosave.watch(page_id, page.text_edit.document())
+        self.pages.append(page)
+        return page
+
+    def stop_autosave(self, page):
+        # فایل باز شده فقط خواندنی است و خودش روی دیسک هست
+        self.autosave.unwatch(page.page_id)
+
+    def show_page_controls(self, visible):
+        self.label.setVisible(not visible)
+        self.input.setVisible(not visible)
+        self.btn_create.setVisible(not visible)
+        self.btn_exit.setVisible(not visible)
+        self.btn_open_folder.setVisible(not visible)
+        self.btn_restore.setVisible(not visible and bool(self.autosave.saved_page_ids()))
+
+        self.btn_add_page.setVisible(visible)
+        self.btn_close_all.setVisible(visible)
+        self.search_input.setVisible(visible)
 
     def arrange_pages(self):
         if self.maximized_page is not None:
@@ -167,15 +330,10 @@ class MainWindow(QWidget):
         if n == 0:
             return
 
-        cols = math.ceil(math.sqrt(n))
-        rows = math.ceil(n / cols)
-
         self.clear_grid()
 
-        for i, page in enumerate(self.pages):
+        for i, (page, (row, col)) in enumerate(zip(self.pages, grid_positions(n))):
             page.update_index(i)
-            row = i // cols
-            col = i % cols
             self.grid_layout.addWidget(page, row, col)
 
     def clear_grid(self):
@@ -190,42 +348,53 @@ class MainWindow(QWidget):
             QMessageBox.warning(self, "هشدار", f"حداکثر تعداد صفحات ({self.MAX_PAGES}) ایجاد شده است.")
             return
 
-        new_index = len(self.pages)
-        page = PageWidget(new_index, self.close_page)
-        page.double_clicked.connect(self.toggle_maximize_page)
-        self.pages.append(page)
-
+        self.new_page(len(self.pages))
         self.arrange_pages()
 
     def close_page(self, page):
         if page in self.pages:
             self.pages.remove(page)
+            self.text_index.remove_document(page)
+            self.autosave.unwatch(page.page_id)
             if self.maximized_page == page:
                 self.maximized_page = None
             page.setParent(None)
             self.arrange_pages()
+            self.search_pages()
 
             if len(self.pages) == 0:
-                self.btn_add_page.hide()
-                self.btn_close_all.hide()
-                self.label.show()
-                self.input.show()
-                self.btn_create.show()
-                self.btn_exit.show()
+                self.show_page_controls(False)
 
     def close_all_pages(self):
         for page in self.pages:
+            page.close_file()
+            self.text_index.remove_document(page)
+            self.autosave.unwatch(page.page_id)
             page.setParent(None)
         self.pages.clear()
         self.maximized_page = None
         self.clear_grid()
-
-        self.btn_add_page.hide()
-        self.btn_close_all.hide()
-        self.label.show()
-        self.input.show()
-        self.btn_create.show()
-        self.btn_exit.show()
+        self.search_pages()
+        self.show_page_controls(False)
+
+    def search_pages(self):
+        self.search_results.clear()
+        query = self.search_input.text()
+        hits = self.text_index.search(query) if self.pages else []
+        for page, position, line in hits:
+            item = QListWidgetItem(f"صفحه {self.pages.index(page) + 1}: {line.strip()[:80]}")
+            item.setData(Qt.ItemDataRole.UserRole, (page, position))
+            self.search_results.addItem(item)
+        self.search_results.setVisible(bool(hits))
+
+    def open_search_result(self, item):
+        page, position = item.data(Qt.ItemDataRole.UserRole)
+        if page not in self.pages:
+            return
+        cursor = page.text_edit.textCursor()
+        cursor.setPosition(position)
+        page.text_edit.setTextCursor(cursor)
+        page.text_edit.setFocus()
 
     def toggle_maximize_page(self, page):
         if self.maximized_page == page:
@@ -234,6 +403,12 @@ class MainWindow(QWidget):
             self.maximized_page = page
         self.arrange_pages()
 
+    def closeEvent(self, event):
+        for page in self.pages:
+            self.autosave.unwatch(page.page_id)
+        self.autosave.close()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     main_win = MainWindow()
@@ -1,16 +1,15 @@
 import sys
-import math
 import random
 import os
-import subprocess
+import threading
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLineEdit, QPushButton,
     QLabel, QMessageBox, QGridLayout, QGroupBox,
-    QSizePolicy, QScrollArea, QHBoxLayout
+    QSizePolicy, QScrollArea, QHBoxLayout, QTableView, QHeaderView, QFileDialog
 )
 from PyQt6.QtGui import QIntValidator, QMouseEvent, QFont, QDrag, QPixmap
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QByteArray, QMimeData
-from reportlab.pdfgen import canvas
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QByteArray, QMimeData, QAbstractTableModel, QModelIndex
+from layout_solver import grid_positions
 
 
 class PageWidget(QGroupBox):
@@ -155,6 +154,10 @@ class PageWidget(QGroupBox):
             self.value_labels[key].setText(str(random.randint(1, 10)))
 
     def create_pdf(self):
+        # reportlab و subprocess فقط وقتی PDF لازم است بارگذاری می‌شوند
+        import subprocess
+        from reportlab.pdfgen import canvas
+
         filename = f"page_{self.index + 1}.pdf"
 
         c = canvas.Canvas(filename)
@@ -183,13 +186,93 @@ class PageWidget(QGroupBox):
             QMessageBox.warning(self, "خطا", f"امکان باز کردن فایل وجود ندارد.\n{e}")
 
 
+class ArrayTableModel(QAbstractTableModel):
+    # مدل مجازی: فقط سطرهای قابل مشاهده از آرایه‌ها خوانده و قالب‌بندی می‌شوند
+    def __init__(self, xs, ys, expression):
+        super().__init__()
+        self.xs = xs
+        self.ys = ys
+        self.expression = expression
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.xs)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        column = self.xs if index.column() == 0 else self.ys
+        return f"{column[index.row()]:.10g}"
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return "x" if section == 0 else self.expression
+        return str(section + 1)
+
+
+class TabulationWindow(QWidget):
+    export_finished = pyqtSignal(str)
+
+    def __init__(self, xs, ys, expression):
+        super().__init__()
+        self.setWindowTitle(f"جدول {expression}")
+        self.resize(500, 700)
+        self.expression = expression
+
+        layout = QVBoxLayout()
+
+        self.model = ArrayTableModel(xs, ys, expression)
+        self.table = QTableView()
+        # ارتفاع ثابت سطرها تا Qt برای میلیون‌ها سطر اندازه‌گیری جداگانه انجام ندهد
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(24)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setModel(self.model)
+        layout.addWidget(self.table)
+
+        self.btn_export = QPushButton("ذخیره CSV")
+        self.btn_export.clicked.connect(self.export_csv)
+        layout.addWidget(self.btn_export)
+        self.export_finished.connect(self.on_export_finished)
+
+        self.setLayout(layout)
+
+    def export_csv(self):
+        filename, _ = QFileDialog.getSaveFileName(self, "ذخیره جدول", "table.csv", "CSV (*.csv)")
+        if not filename:
+            return
+        # نوشتن میلیون‌ها سطر چند ثانیه طول می‌کشد، پس در thread جدا انجام می‌شود
+        self.btn_export.setEnabled(False)
+        self.btn_export.setText("در حال ذخیره...")
+        threading.Thread(target=self._write_csv, args=(filename,), daemon=True).start()
+
+    def _write_csv(self, filename):
+        import calc_core
+        try:
+            calc_core.export_csv(filename, self.model.xs, self.model.ys, f"x,{self.expression}")
+        except OSError as e:
+            self.export_finished.emit(str(e))
+        else:
+            self.export_finished.emit("")
+
+    def on_export_finished(self, error):
+        self.btn_export.setEnabled(True)
+        self.btn_export.setText("ذخیره CSV")
+        if error:
+            QMessageBox.warning(self, "خطا", f"امکان ذخیره فایل وجود ندارد.\n{error}")
+
+
 class CalculatorWidget(QWidget):
     double_clicked = pyqtSignal()
 
     def __init__(self):
         super().__init__()
 
-        self.setFixedHeight(250)  # ارتفاع ثابت برای ماشین حساب (می‌توانید تغییر دهید)
+        self.setFixedHeight(320)  # ارتفاع ثابت برای ماشین حساب (می‌توانید تغییر دهید)
 
         layout = QVBoxLayout()
 
@@ -199,6 +282,11 @@ class CalculatorWidget(QWidget):
         self.display.setFixedHeight(40)
         layout.addWidget(self.display)
 
+        # بازه متغیر x برای حالت جدول
+        self.range_input = QLineEdit()
+        self.range_input.setPlaceholderText("x = 0..1e6 step 1")
+        layout.addWidget(self.range_input)
+
         buttons_layout = QGridLayout()
 
         buttons = [
@@ -206,7 +294,8 @@ class CalculatorWidget(QWidget):
             ('4', 1, 0, 1, 1), ('5', 1, 1, 1, 1), ('6', 1, 2, 1, 1), ('*', 1, 3, 1, 1),
             ('1', 2, 0, 1, 1), ('2', 2, 1, 1, 1), ('3', 2, 2, 1, 1), ('-', 2, 3, 1, 1),
             ('0', 3, 0, 1, 1), ('.', 3, 1, 1, 1), ('C', 3, 2, 1, 1), ('+', 3, 3, 1, 1),
-            ('=', 4, 0, 1, 4)
+            ('x', 4, 0, 1, 1), ('(', 4, 1, 1, 1), (')', 4, 2, 1, 1), ('جدول', 4, 3, 1, 1),
+            ('=', 5, 0, 1, 4)
         ]
 
         for text, row, col, rowspan, colspan in buttons:
@@ -217,6 +306,8 @@ class CalculatorWidget(QWidget):
         layout.addLayout(buttons_layout)
         self.setLayout(layout)
 
+        self.table_window = None
+
     def mouseDoubleClickEvent(self, event):
         self.double_clicked.emit()
 
@@ -226,6 +317,8 @@ class CalculatorWidget(QWidget):
 
         if text == 'C':
             self.display.clear()
+        elif text == 'جدول':
+            self.show_table()
         elif text == '=':
             try:
                 result = str(eval(self.display.text()))
@@ -235,6 +328,21 @@ class CalculatorWidget(QWidget):
         else:
             self.display.setText(self.display.text() + text)
 
+    def show_table(self):
+        # numpy فقط برای حالت جدول لازم است
+        import calc_core
+
+        expression = self.display.text()
+        range_text = self.range_input.text() or self.range_input.placeholderText()
+        try:
+            xs, ys = calc_core.tabulate(expression, range_text)
+        except Exception as e:
+            QMessageBox.warning(self, "خطا", f"محاسبه جدول ممکن نیست.\n{e}")
+            return
+
+        self.table_window = TabulationWindow(xs, ys, expression)
+        self.table_window.show()
+
 
 class CalculatorPage(QGroupBox):
     double_clicked = pyqtSignal(object)
@@ -444,16 +552,13 @@ class MainWindow(QWidget):
         if count == 0:
             return
 
-        cols = math.ceil(math.sqrt(count))
-        rows = math.ceil(count / cols)
-
         # اضافه کردن صفحات به شبکه
-        for index, page in enumerate(self.pages):
+        for index, (page, (row, col)) in enumerate(zip(self.pages, grid_positions(count))):
             page.update_index(index)
             # فقط اگر صفحه متد set_number_box_style داشت، صدا بزن
             if hasattr(page, 'set_number_box_style'):
                 page.set_number_box_style(self.dark_mode)
-            self.grid_layout.addWidget(page, index // cols, index % cols)
+            self.grid_layout.addWidget(page, row, col)
 
         self.scroll_area.update()
         self.container.update()